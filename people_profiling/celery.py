@@ -1,8 +1,16 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'people_profiling.settings')
 
 app = Celery('people_profiling')
 app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
+
+
+@worker_process_init.connect
+def warm_db_connection(**kwargs):
+    """Open each worker process's (persistent) DB connection at startup instead of on its first task."""
+    from django.db import connection
+    connection.ensure_connection()
@@ -1,60 +1,84 @@
 # profiles/activity_views.py
-import json
+import numpy as np
+import orjson
+from django.core.cache import cache
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count
-from django.db.models.functions import TruncMonth
+from django.db.models import CharField, Count, F, Func, Max, Value
 from .models import RawPost, Profile
 
+# Platform line colors, in legend order
+_PLATFORM_COLORS = (
+    ("Twitter", "#1DA1F2"),
+    ("Instagram", "#E1306C"),
+    ("TikTok", "#69C9D0"),
+    ("GitHub", "#333"),
+    ("Sherlock", "#0d6efd"),
+)
+_PLATFORM_IDX = {platform: i for i, (platform, _) in enumerate(_PLATFORM_COLORS)}
+
+
 def activity_view(request, pk):
-    profile = get_object_or_404(Profile, pk=pk)
+    profile = get_object_or_404(
+        Profile.objects.only("id", "username", "platform", "avatar_url", "verified"), pk=pk
+    )
+
+    # Chart data only changes when new posts land, so key the cache on the latest post timestamp
+    version = RawPost.objects.filter(profile=profile).aggregate(v=Max("timestamp"))["v"]
+    cache_key = f"activity:{profile.pk}:{version.timestamp() if version else 0}"
+    cached = cache.get(cache_key)
+    if cached:
+        labels_json, datasets_json = cached
+        return render(
+            request,
+            "profiles/activity.html",
+            {"profile": profile, "labels": labels_json, "datasets": datasets_json},
+        )
 
-    # Aggregate posts/activity by month across social accounts
+    # Aggregate posts/activity by month across social accounts.
+    # Month labels ("YYYY-MM") are formatted by PostgreSQL, so no datetimes reach Python.
     posts_data = (
     RawPost.objects.filter(profile=profile)
-        .annotate(month=TruncMonth("created_at"))
-        .values("platform", "month")
+        .annotate(month=Func(F("timestamp"), Value("YYYY-MM"), function="to_char", output_field=CharField()))
+        .values_list("platform", "month")
         .annotate(count=Count("id"))
         .order_by("month")
     )
 
+    posts_data = [row for row in posts_data if row[1]]
+
     # Labels for x-axis (months)
-    labels = sorted(set([str(item["month"].date()) for item in posts_data if item["month"]]))
+    labels = sorted({month for _, month, _ in posts_data})
 
-    # Define platform colors
-    colors = {
-        "Twitter": "#1DA1F2",
-        "Instagram": "#E1306C",
-        "TikTok": "#69C9D0",
-        "GitHub": "#333",
-        "Sherlock": "#0d6efd",
-    }
+    # Pivot into a dense platforms × months count matrix
+    label_idx = {label: i for i, label in enumerate(labels)}
+    counts = np.zeros((len(_PLATFORM_COLORS), len(labels)), dtype=np.int32)
+    for platform, month, count in posts_data:
+        row = _PLATFORM_IDX.get(platform)
+        if row is not None:
+            counts[row, label_idx[month]] = count
 
     # Prepare datasets: one line per platform
-    datasets = []
-    for platform, color in colors.items():
-        counts = []
-        for label in labels:
-            count = next(
-                (item["count"] for item in posts_data
-                 if str(item["month"].date()) == label and item["platform"] == platform),
-                0,
-            )
-            counts.append(count)
-
-        datasets.append({
+    datasets = [
+        {
             "label": platform,
-            "data": counts,
+            "data": counts[i].tolist(),
             "borderColor": color,
             "backgroundColor": color,
             "tension": 0.3,
-        })
+        }
+        for i, (platform, color) in enumerate(_PLATFORM_COLORS)
+    ]
+
+    labels_json = orjson.dumps(labels).decode()
+    datasets_json = orjson.dumps(datasets).decode()
+    cache.set(cache_key, (labels_json, datasets_json), 3600)
 
     return render(
         request,
         "profiles/activity.html",
         {
             "profile": profile,
-            "labels": json.dumps(labels),
-            "datasets": json.dumps(datasets),
+            "labels": labels_json,
+            "datasets": datasets_json,
         },
     )
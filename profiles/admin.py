@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db.models import Count, Q
+from django.db.models.functions import Substr
 from .models import BehavioralAnalysis, Profile, RawPost, SocialMediaAccount
 
 
@@ -7,12 +9,37 @@ class ProfileAdmin(admin.ModelAdmin):
     list_display = (
         'username', 'platform', 'full_name', 'location',
         'date_profiled', 'profile_created_at', 'github_created_at',
-        'tiktok_user_id', 'verified',
+        'tiktok_user_id', 'verified', 'posts_count_display',
+    )
+    list_filter = (
+        ('platform', admin.ChoicesFieldListFilter),
+        ('date_profiled', admin.DateFieldListFilter),
+        'verified',
     )
-    list_filter = ('platform', 'date_profiled', 'verified')
     search_fields = ('username', 'full_name', 'location', 'company', 'tiktok_user_id')
     ordering = ('-date_profiled',)
 
+    def get_queryset(self, request):
+        # One GROUP BY count for the page instead of a COUNT query per row
+        return super().get_queryset(request).annotate(_posts_count=Count('rawpost'))
+
+    def posts_count_display(self, obj):
+        return obj._posts_count
+    posts_count_display.short_description = "Posts"
+    posts_count_display.admin_order_field = '_posts_count'
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        The default icontains search over search_fields, plus fuzzy (%) matches
+        on username and full_name. Both lookups are served by the trigram GIN indexes.
+        """
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            results |= queryset.filter(
+                Q(username__trigram_similar=search_term) | Q(full_name__trigram_similar=search_term)
+            )
+        return results, may_have_duplicates
+
 
 @admin.register(SocialMediaAccount)
 class SocialMediaAccountAdmin(admin.ModelAdmin):
@@ -23,9 +50,17 @@ class SocialMediaAccountAdmin(admin.ModelAdmin):
         'posts_collected', 'is_private',
         'show_verified',
     )
-    list_filter = ('platform', 'created_at', 'is_private')
+    list_filter = (
+        ('platform', admin.ChoicesFieldListFilter),
+        ('created_at', admin.DateFieldListFilter),
+        'is_private',
+    )
     search_fields = ('profile__username', 'bio', 'tiktok_region')
     ordering = ('-created_at',)
+    list_select_related = ('profile',)
+    raw_id_fields = ('profile',)
+    list_per_page = 50
+    show_full_result_count = False
 
     # Show Profile.verified inside SocialMediaAccount
     def show_verified(self, obj):
@@ -39,10 +74,23 @@ class RawPostAdmin(admin.ModelAdmin):
     list_display = ("profile", "platform", "short_content", "timestamp", "likes", "comments", "sentiment_score")
     search_fields = ("profile__username", "content", "platform")
     list_filter = ("platform", "timestamp")
+    list_select_related = ("profile",)
+    raw_id_fields = ("profile",)
+    list_per_page = 50
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # Only the first 51 chars of content travel from the DB (enough to detect truncation)
+        return (
+            super().get_queryset(request)
+            .only("id", "profile", "platform", "timestamp", "likes", "comments", "sentiment_score")
+            .annotate(_preview=Substr("content", 1, 51))
+        )
 
     def short_content(self, obj):
         """Show first 50 chars of post content."""
-        return (obj.content[:50] + "...") if len(obj.content) > 50 else obj.content
+        preview = obj._preview or ""
+        return (preview[:50] + "...") if len(preview) > 50 else preview
     short_content.short_description = "Post Content"
 
 
@@ -50,3 +98,5 @@ class RawPostAdmin(admin.ModelAdmin):
 class BehavioralAnalysisAdmin(admin.ModelAdmin):
     list_display = ("profile", "sentiment_score", "avg_post_time", "analyzed_at")
     search_fields = ("profile__username",)
+    list_select_related = ("profile",)
+    raw_id_fields = ("profile",)
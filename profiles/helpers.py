@@ -1,26 +1,32 @@
 import os
+import logging
 from celery import Celery
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# Environment is fixed at process start: resolve it, the broker and the app once.
+# The app is reused across calls so its broker connection pool survives between sends.
+_IS_LOCAL = (
+    "render" not in os.environ.get("RENDER", "").lower()
+    and "DESKTOP" in os.environ.get("COMPUTERNAME", "").upper()
+)
+_BROKER = settings.LOCAL_REDIS_URL if _IS_LOCAL else settings.CELERY_BROKER_URL
+_BACKEND = settings.LOCAL_REDIS_URL if _IS_LOCAL else settings.CELERY_RESULT_BACKEND
+_APP = Celery("people_profiling", broker=_BROKER)
+_APP.conf.update(result_backend=_BACKEND, broker_pool_limit=10)
+
+
 def send_tiktok_task(username: str):
     """
     Sends a TikTok scraping task to the appropriate Redis queue.
     - Local dev → uses local Docker Redis.
     - Production → uses Render Redis.
     """
-    is_local = "render" not in os.getenv("RENDER", "").lower() and "DESKTOP" in os.getenv("COMPUTERNAME", "").upper()
-    broker_url = "redis://localhost:6379/0" if is_local else settings.CELERY_BROKER_URL
-    backend_url = "redis://localhost:6379/0" if is_local else settings.CELERY_RESULT_BACKEND
-
-    # Optional visual feedback in your terminal
-    env = "LOCAL Docker Redis" if is_local else "Render Redis"
-    print(f"🚀 Sending TikTok task via {env}: {broker_url}")
-
-    # Build Celery instance and send task
-    app = Celery("people_profiling", broker=broker_url)
-    app.conf.update(result_backend=backend_url)
+    env = "LOCAL Docker Redis" if _IS_LOCAL else "Render Redis"
+    logger.debug("Sending TikTok task via %s: %s", env, _BROKER)
 
-    app.send_task(
+    _APP.send_task(
         "profiles.tasks.scrape_tiktok_task",
         args=[username],
         queue="tiktok"
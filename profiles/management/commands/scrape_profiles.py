@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from profiles.tasks import enqueue_scrapes
+
+
+class Command(BaseCommand):
+    help = (
+        "Queue scrapes for many usernames on one platform. TikTok and Instagram go through "
+        "scrape_profiles_batch, whose saved profiles are analyzed by perform_behavioral_analysis_bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("platform", choices=["Twitter", "TikTok", "Instagram"])
+        parser.add_argument("usernames", nargs="*", help="Usernames to scrape")
+        parser.add_argument("--file", help="Read more usernames from this file, one per line")
+
+    def handle(self, *args, **options):
+        platform = options["platform"]
+        usernames = [u.strip() for u in options["usernames"]]
+        if options["file"]:
+            try:
+                with open(options["file"], encoding="utf-8") as f:
+                    usernames += [line.strip() for line in f]
+            except OSError as e:
+                raise CommandError(f"Can't read {options['file']}: {e}")
+
+        # Drop blanks and repeats, keeping the given order
+        usernames = list(dict.fromkeys(u for u in usernames if u))
+        if not usernames:
+            raise CommandError("No usernames given.")
+
+        result = enqueue_scrapes(usernames, platform)
+        if result is None:
+            self.stdout.write(self.style.WARNING(f"⏭️ Nothing queued: every {platform} username was recently not found."))
+            return
+        self.stdout.write(self.style.SUCCESS(f"🚀 Queued {platform} scrapes from {len(usernames)} usernames ({len(result.results)} tasks)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-15 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0016_remove_profile_posts_count_alter_rawpost_platform_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rawpost',
+            name='timestamp',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.14 on 2026-10-15 09:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0017_alter_rawpost_timestamp'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rawpost',
+            index=models.Index(fields=['profile', 'timestamp'], name='rawpost_profile_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rawpost',
+            index=models.Index(fields=['profile', 'platform', 'timestamp'], name='rawpost_profile_plat_ts_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-15 09:40
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def drop_duplicate_posts(apps, schema_editor):
+    """Keep the newest row of each (profile, post_id) so the unique constraint can be added."""
+    RawPost = apps.get_model('profiles', 'RawPost')
+    duplicates = (
+        RawPost.objects.exclude(post_id__isnull=True)
+        .values('profile_id', 'post_id')
+        .annotate(keep=Max('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        RawPost.objects.filter(profile_id=dup['profile_id'], post_id=dup['post_id']).exclude(id=dup['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0019_profile_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_posts, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='rawpost',
+            unique_together={('profile', 'post_id')},
+        ),
+    ]
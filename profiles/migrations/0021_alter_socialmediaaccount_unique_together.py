@@ -0,0 +1,33 @@
+# Generated by Django 5.0.14 on 2026-10-15 10:30
+
+from django.db import migrations
+from django.db.models import Count, Max
+
+
+def drop_duplicate_accounts(apps, schema_editor):
+    """Keep the newest account of each (profile, platform) so the unique constraint can be added."""
+    SocialMediaAccount = apps.get_model('profiles', 'SocialMediaAccount')
+    duplicates = (
+        SocialMediaAccount.objects.values('profile_id', 'platform')
+        .annotate(keep=Max('id'), rows=Count('id'))
+        .filter(rows__gt=1)
+    )
+    for dup in duplicates.iterator():
+        SocialMediaAccount.objects.filter(
+            profile_id=dup['profile_id'], platform=dup['platform']
+        ).exclude(id=dup['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0020_alter_rawpost_unique_together'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicate_accounts, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='socialmediaaccount',
+            unique_together={('profile', 'platform')},
+        ),
+    ]
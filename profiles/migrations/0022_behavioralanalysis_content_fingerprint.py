@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-15 11:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiles', '0021_alter_socialmediaaccount_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='behavioralanalysis',
+            name='content_fingerprint',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
  
 class Profile(models.Model):
@@ -29,6 +30,10 @@ class Profile(models.Model):
 
     class Meta:
         unique_together = ('username', 'platform')  # ensure uniqueness only per platform
+        indexes = [
+            GinIndex(fields=["username"], name="profile_username_trgm", opclasses=["gin_trgm_ops"]),
+            GinIndex(fields=["full_name"], name="profile_full_name_trgm", opclasses=["gin_trgm_ops"]),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.platform})"
@@ -63,6 +68,8 @@ class SocialMediaAccount(models.Model):
     tiktok_region = models.CharField(max_length=100, blank=True, null=True)
     verified = models.BooleanField(default=False)   # ✅ add this
     
+    class Meta:
+        unique_together = ('profile', 'platform')  # one account row per profile/platform, lets scrapers upsert
 
     def __str__(self):
         return f"{self.platform} account for {self.profile.username}"
@@ -72,11 +79,18 @@ class RawPost(models.Model):
     platform = models.CharField(max_length=50, choices=Profile.PLATFORM_CHOICES)
     post_id = models.CharField(max_length=255, blank=True, null=True)
     content = models.TextField()
-    timestamp = models.DateTimeField(blank=True, null=True)
+    timestamp = models.DateTimeField(blank=True, null=True, db_index=True)
     likes = models.IntegerField(default=0)
     comments = models.IntegerField(default=0)
     sentiment_score = models.FloatField(blank=True, null=True)
 
+    class Meta:
+        unique_together = ("profile", "post_id")
+        indexes = [
+            models.Index(fields=["profile", "timestamp"], name="rawpost_profile_ts_idx"),
+            models.Index(fields=["profile", "platform", "timestamp"], name="rawpost_profile_plat_ts_idx"),
+        ]
+
     def __str__(self):
         return f"{self.platform} post by {self.profile.username}"
 
@@ -98,6 +112,8 @@ class BehavioralAnalysis(models.Model):
     interests = models.JSONField(null=True, blank=True)
     # Last analysis date
     analyzed_at = models.DateTimeField(auto_now=True)
+    # Digest of the inputs the last run saw; an unchanged profile skips re-analysis
+    content_fingerprint = models.CharField(max_length=16, blank=True, default="")
 
     def __str__(self):
         return f"Behavioral Analysis for {self.profile.username}"
@@ -1,77 +1,301 @@
+import hashlib
+import json
 import logging
 import random
 import re
-import pandas as pd
-from textblob import TextBlob
-from celery import shared_task
-from django.db import transaction
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import groupby
+from operator import itemgetter
+import redis
+from celery import group, shared_task
+from celery.exceptions import Ignore
+from django.conf import settings
+from django.db import connection, transaction
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import Prefetch, TextField, Value
+from django.db.models.functions import MD5, Cast, Concat
 from django.utils import timezone
 
 from profiles.models import BehavioralAnalysis, Profile, RawPost, SocialMediaAccount
 from profiles.utils.twitter_scrapingbee_scraper import scrape_twitter_profile
 from profiles.utils.tiktok_scraper import scrape_tiktok_profile
-# from profiles.utils.instagram_scraper import scrape_instagram_profile
 from profiles.utils.instagram_scrapingbee_scraper import scrape_instagram_profile
+from profiles.utils.scrape_errors import PermanentScrapeError, RateLimited, TransientScrapeError
+from profiles.utils.scrape_result import ScrapeResult
+from profiles.utils.sentiment import polarity
+from profiles.utils.upserts import upsert_account, upsert_profile
+from profiles.utils import rate_limit
 
 
 logger = logging.getLogger(__name__)
 
+# Keyword extraction patterns, compiled once per worker; _WORD_RE only ever sees lowercased text
+_HASHTAG_RE = re.compile(r"#(\w+)")
+_WORD_RE = re.compile(r"\b[a-z]{4,}\b")
+
 
 # ==========================================================
 # 🧠 Helper
 # ==========================================================
 def ensure_behavioral_record(profile):
-    """Ensure a BehavioralAnalysis record exists for the given profile."""
-    BehavioralAnalysis.objects.get_or_create(profile=profile)
+    """Ensure a BehavioralAnalysis record exists for the given profile (one INSERT ... ON CONFLICT DO NOTHING)."""
+    BehavioralAnalysis.objects.bulk_create([BehavioralAnalysis(profile=profile)], ignore_conflicts=True)
+
+
+def record_permanent_failure(username: str, platform: str):
+    """Store a minimal private/unavailable account so the dashboard shows the failure."""
+    profile = upsert_profile(
+        username=username,
+        platform=platform,
+        defaults={"full_name": "", "avatar_url": None},
+    )
+
+    upsert_account(
+        profile=profile,
+        platform=platform,
+        defaults={
+            "bio": "",
+            "followers": 0,
+            "following": 0,
+            "posts_collected": 0,
+            "is_private": True,
+            "external_url": None,
+            "source": "error",
+        },
+    )
+
+
+def _upsert_profile_and_account(platform: str, username: str, profile_fields: dict, account_fields: dict) -> Profile:
+    """
+    Write a successful scrape's Profile + SocialMediaAccount rows and queue the
+    behavioral analysis for when they commit. Call inside transaction.atomic().
+    """
+    profile = upsert_profile(
+        username=username, platform=platform, defaults=profile_fields, insert_only={"full_name": username}
+    )
+    upsert_account(profile=profile, platform=platform, defaults=account_fields)
+    ensure_behavioral_record(profile)
+    transaction.on_commit(lambda pid=profile.id: perform_behavioral_analysis.delay(pid), robust=True)
+    return profile
+
+
+def backoff_countdown(retries: int, base: int = 60, cap: int = 900) -> float:
+    """Exponential retry delay with jitter, so failed tasks don't retry in lockstep."""
+    delay = min(base * (2 ** retries), cap)
+    return random.uniform(delay / 2, delay * 1.5)
+
+
+# Longest server-requested Retry-After we honour; anything beyond it is clamped
+RETRY_AFTER_CAP = 1800
+
+
+def retry_after_countdown(wait_seconds: float) -> float:
+    """Countdown for a server-provided Retry-After: clamped to [5, RETRY_AFTER_CAP], plus a little jitter."""
+    return min(max(wait_seconds, 5), RETRY_AFTER_CAP) + random.uniform(0, 5)
+
+
+# A username scraped this recently is served from the last run's cached summary instead of hitting upstream again
+RECENT_SCRAPE_TTL = 600
+
+
+def _recent_key(platform: str, username: str) -> str:
+    return f"scraped:{platform}:{username.lower()}"
+
+
+def recently_scraped(platform: str, username: str) -> dict | None:
+    """
+    The summary of this username's last successful scrape if it ran within RECENT_SCRAPE_TTL, else None.
+    Kept in the shared Redis, so a duplicate picked up by a worker on another host is skipped too.
+    """
+    try:
+        raw = rate_limit.redis_client().get(_recent_key(platform, username))
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Recent-scrape store unavailable for {platform} {username}: {e}")
+        return None
+    return json.loads(raw) if raw else None
+
+
+def mark_scraped(platform: str, username: str, summary: dict):
+    try:
+        rate_limit.redis_client().set(_recent_key(platform, username), json.dumps(summary), ex=RECENT_SCRAPE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not mark {platform} {username} as scraped: {e}")
+
+
+def skipped_recent(username: str, platform: str, summary: dict) -> dict:
+    logger.info(f"⏭️ {platform} {username} scraped within the last {RECENT_SCRAPE_TTL}s, serving cached result")
+    return {**summary, "cached": True}
+
+
+def _scrape_summary(platform: str, username: str, result: ScrapeResult) -> dict:
+    """Task return value for a successful ScrapeResult (also what the recent-scrape cache serves)."""
+    return {
+        "success": True,
+        "username": username,
+        "platform": platform,
+        "followers": result.followers,
+        "following": result.following,
+        "likes": result.likes,
+        "total_posts": result.total_posts,
+        "source": result.source,
+    }
+
+
+# Usernames that came back 404/permanent are not worth enqueueing again for a day
+NOT_FOUND_TTL = 86400
+
+
+def _not_found_key(platform: str, username: str) -> str:
+    return f"nf:{platform}:{username.lower()}"
+
+
+def known_not_found(platform: str, username: str) -> bool:
+    """
+    True if a scrape of this username failed permanently within NOT_FOUND_TTL.
+    Read from the shared Redis: the worker that saw the 404 and the web process that enqueues run on different hosts.
+    """
+    try:
+        return bool(rate_limit.redis_client().exists(_not_found_key(platform, username)))
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Not-found store unavailable for {platform} {username}: {e}")
+        return False
+
+
+def mark_not_found(platform: str, username: str):
+    try:
+        rate_limit.redis_client().set(_not_found_key(platform, username), 1, ex=NOT_FOUND_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not mark {platform} {username} as not found: {e}")
+
+
+# Compare-and-delete: a lock is only released by the owner that set it
+_RELEASE_LOCK_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_release_lock_script = None
+
+
+def acquire_lock(key: str, owner, ttl: int) -> bool:
+    """
+    SET key owner NX EX ttl on the shared Redis, so the lock holds across workers and hosts.
+    Fails open like the rate limiter: if Redis is unreachable the caller proceeds unlocked.
+    """
+    try:
+        return bool(rate_limit.redis_client().set(key, str(owner), nx=True, ex=ttl))
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Lock store unavailable for {key}: {e}")
+        return True
+
+
+def release_lock(key: str, owner):
+    """Delete the lock in one atomic Lua call, only if ``owner`` still holds it (it may have expired and been re-taken)."""
+    global _release_lock_script
+    try:
+        if _release_lock_script is None:
+            _release_lock_script = rate_limit.redis_client().register_script(_RELEASE_LOCK_LUA)
+        _release_lock_script(keys=[key], args=[str(owner)])
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Could not release lock {key}: {e}")
+
+
+# One in-flight scrape per (platform, username); expires on its own if a worker dies mid-scrape
+SCRAPE_LOCK_TTL = 300
+
+
+def _scrape_lock_key(platform: str, username: str) -> str:
+    return f"lock:scrape:{platform}:{username.lower()}"
+
+
+def acquire_scrape_lock(platform: str, username: str, owner: str) -> bool:
+    """Claim the username for this task; False if another task is already scraping it."""
+    return acquire_lock(_scrape_lock_key(platform, username), owner, SCRAPE_LOCK_TTL)
+
+
+def release_scrape_lock(platform: str, username: str, owner: str):
+    """Release the claim, but only if this task still holds it."""
+    release_lock(_scrape_lock_key(platform, username), owner)
+
+
+def throttle(task, platform: str):
+    """
+    Defer the task while the platform's shared token bucket is empty, so the
+    fleet stays under the known request ceiling instead of finding it via 429s.
+    The deferral is a fresh publish that carries the current retry count over
+    unchanged, so waiting for a token never uses up the task's retry budget.
+    """
+    wait = rate_limit.take(platform)
+    if wait > 0:
+        task.apply_async(
+            args=task.request.args,
+            kwargs=task.request.kwargs,
+            countdown=wait + random.uniform(0, 1),
+            retries=task.request.retries,
+        )
+        raise Ignore()
 
 
 # ==========================================================
 # 🐦 TWITTER TASK
 
-@shared_task(bind=True, max_retries=3, default_retry_delay=60, queue="twitter")
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60, acks_late=True, queue="twitter")
 def scrape_twitter_task(self, username: str) -> dict:
     """
     Celery task to scrape a Twitter profile via ScrapingBee/Nitter,
     update database models, and trigger behavioral analysis.
     """
+    cached = recently_scraped("Twitter", username)
+    if cached:
+        return skipped_recent(username, "Twitter", cached)
+
+    throttle(self, "Twitter")
+
+    # Repeated searches for the same username collapse onto the scrape already in flight
+    if not acquire_scrape_lock("Twitter", username, self.request.id):
+        logger.info(f"⏭️ Twitter profile {username} is being scraped by another task, skipping")
+        return {
+            "success": True,
+            "username": username,
+            "platform": "Twitter",
+            "skipped": True,
+            "reason": "concurrent",
+        }
+
     try:
-        # --- Run scraper ---
-        logger.info(f"🚀 Starting Twitter scrape task for @{username}")
-        result = scrape_twitter_profile(username)
-
-        # --- Handle scrape failure ---
-        if not result.get("success"):
-            reason = result.get("error", "Unknown scrape failure")
-            logger.warning(f"⚠️ Twitter scrape failed for {username}: {reason}")
-            raise Exception(reason)
-
-        # --- Upsert Profile ---
-        profile, _ = Profile.objects.get_or_create(
-            username=username,
-            platform="Twitter",
-            defaults={
-                "full_name": result.get("full_name", username),
-                "avatar_url": result.get("avatar_url", ""),
-            },
-        )
-        profile.full_name = result.get("full_name", username)
-        profile.avatar_url = result.get("avatar_url", "")
-        profile.posts_count = result.get("total_tweets_scraped", 0)
-        profile.save()
-
-        # --- Upsert SocialMediaAccount ---
-        SocialMediaAccount.objects.update_or_create(
-            profile=profile,
-            platform="Twitter",
-            defaults={
-                "bio": result.get("bio", ""),
-                "followers": result.get("followers", 0),
-                "following": result.get("following", 0),
-                "posts_collected": result.get("tweets_saved", 0),
-                "is_private": False,
-                "external_url": None,
-            },
-        )
+        # The scraper's profile/account/tweet writes and the upserts below commit together;
+        # psycopg2 only sends BEGIN with the first query, so the fetch itself holds no transaction
+        with transaction.atomic():
+            # --- Run scraper ---
+            logger.info(f"🚀 Starting Twitter scrape task for @{username}")
+            result = scrape_twitter_profile(username)
+
+            # --- Handle scrape failure ---
+            if not result.get("success"):
+                reason = result.get("error", "Unknown scrape failure")
+                logger.warning(f"⚠️ Twitter scrape failed for {username}: {reason}")
+                raise Exception(reason)
+
+            # --- Upsert Profile + SocialMediaAccount; analysis runs once they are committed ---
+            profile = _upsert_profile_and_account(
+                "Twitter",
+                username,
+                profile_fields={
+                    "full_name": result.get("full_name", username),
+                    "avatar_url": result.get("avatar_url", ""),
+                },
+                account_fields={
+                    "bio": result.get("bio", ""),
+                    "followers": result.get("followers", 0),
+                    "following": result.get("following", 0),
+                    "posts_collected": result.get("tweets_saved", 0),
+                    "is_private": False,
+                    "external_url": None,
+                },
+            )
 
         # --- Tweets are already saved inside scraper ---
         # But double-check at least one exists
@@ -81,16 +305,8 @@ def scrape_twitter_task(self, username: str) -> dict:
         else:
             logger.info(f"💾 Verified {saved_posts} tweets saved for {username}")
 
-        # --- Trigger Behavioral Analysis ---
-        try:
-            ensure_behavioral_record(profile)
-            perform_behavioral_analysis.delay(profile.id)
-            logger.info(f"🧠 Behavioral analysis queued for {username} (Twitter)")
-        except Exception as e:
-            logger.warning(f"⚠️ Behavioral analysis not started: {e}")
-
-        logger.info(f"✅ Completed Twitter scrape for @{username}")
-        return {
+        logger.info(f"🧠 Behavioral analysis queued for {username} (Twitter)")
+        summary = {
             "success": True,
             "username": username,
             "platform": "Twitter",
@@ -99,309 +315,503 @@ def scrape_twitter_task(self, username: str) -> dict:
             "tweets": result.get("total_tweets_scraped", 0),
             "source": result.get("source", "unknown"),
         }
+        mark_scraped("Twitter", username, summary)
+        logger.info(f"✅ Completed Twitter scrape for @{username}")
+        return summary
 
     except Exception as e:
-        logger.exception(f"❌ Error scraping Twitter for {username}")
+        # Lazy %-formatting and no traceback while retrying; the full one is logged once retries run out
+        logger.warning("❌ Error scraping Twitter for %s: %s", username, e)
         try:
-            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
+            raise self.retry(exc=e, countdown=backoff_countdown(self.request.retries))
         except self.MaxRetriesExceededError:
-            logger.error(f"🚫 Max retries exceeded for Twitter scrape: {username}")
+            logger.error("🚫 Max retries exceeded for Twitter scrape: %s", username, exc_info=e)
             return {
                 "success": False,
                 "username": username,
                 "platform": "Twitter",
                 "reason": str(e),
             }
+    finally:
+        release_scrape_lock("Twitter", username, self.request.id)
 
 
 # ==========================================================
-# 🎵 TIKTOK TASK (Refactored for Playwright fallback)
+# 🎵📸 TIKTOK / INSTAGRAM TASKS
 # ==========================================================
-@shared_task(bind=True, max_retries=3, default_retry_delay=60, queue="tiktok")
-def scrape_tiktok_task(self, username: str) -> dict:
-    """
-    Scrape TikTok profile using ScrapingBee + Playwright fallback,
-    save to DB, and trigger behavioral analysis.
-    """
-    from profiles.utils.tiktok_scraper import scrape_tiktok_profile
+SCRAPERS = {
+    "TikTok": scrape_tiktok_profile,
+    "Instagram": scrape_instagram_profile,
+}
+
+# Where the platforms differ is data, not code
+PLATFORM_CONFIG = {
+    "TikTok": {
+        "max_retries": 3,
+        "retry_base": 60,
+        "empty_is_permanent": False,  # "nothing parsed" is retried
+        "retry_rules": None,  # None = retry every unexpected error with backoff
+        "detect_private": False,
+    },
+    "Instagram": {
+        "max_retries": 5,
+        "retry_base": 120,
+        "empty_is_permanent": True,
+        # (pattern, cooldown seconds or None for backoff); first match wins, no match = give up
+        "retry_rules": (
+            (re.compile(r"Please wait"), 600),
+            (re.compile(r"401|429|temporarily unavailable"), None),
+        ),
+        "detect_private": True,
+    },
+}
+
+
+def _scrape_profile(task, platform: str, username: str) -> dict:
+    """Shared body of the TikTok/Instagram tasks: scrape, upsert, queue analysis, retry per PLATFORM_CONFIG."""
+    cfg = PLATFORM_CONFIG[platform]
+    failure = {"success": False, "username": username, "platform": platform}
+
+    cached = recently_scraped(platform, username)
+    if cached:
+        return skipped_recent(username, platform, cached)
+
+    throttle(task, platform)
+
+    # Retries and duplicate enqueues for the same username collapse onto the scrape already in flight
+    owner = task.request.id
+    if not acquire_scrape_lock(platform, username, owner):
+        logger.info(f"⏭️ {platform} profile {username} is being scraped by another task, skipping")
+        return {
+            "success": True,
+            "username": username,
+            "platform": platform,
+            "skipped": True,
+            "reason": "concurrent",
+        }
 
     try:
-        logger.info(f"🎵 Starting TikTok scrape task for {username}")
-        result = scrape_tiktok_profile(username)
-
-        # --- Handle failure gracefully
-        if not result.get("success"):
-            reason = result.get("reason") or result.get("error") or "Unknown error"
-            raise Exception(f"TikTok scrape failed for {username}: {reason}")
-
-        # --- Extract returned info safely
-        full_name = result.get("full_name", "")
-        bio = result.get("bio", "")
-        followers = result.get("followers", 0)
-        following = result.get("following", 0)
-        likes = result.get("likes", 0)
-        avatar = result.get("avatar") or result.get("avatar_url", "")
-        source = result.get("source", "unknown")
-
-        # --- Update or create Profile + SocialMediaAccount
-        profile, _ = Profile.objects.update_or_create(
-            username=username,
-            platform="TikTok",
-            defaults={
-                "full_name": full_name,
-                "avatar_url": avatar,
-                "posts_count": 0,
-            },
-        )
+        logger.info(f"🚀 Starting {platform} scrape task for {username}")
+        result = SCRAPERS[platform](username)
+        if not isinstance(result, ScrapeResult):
+            result = ScrapeResult.from_dict(username, result or {"success": False, "reason": "No data"})
+
+        # --- Handle failure
+        if not result.success:
+            reason = result.reason or "Unknown error"
+            if not cfg["empty_is_permanent"]:
+                raise Exception(f"{platform} scrape failed for {username}: {reason}")
+            logger.warning(f"Permanent failure scraping {platform} {username}: {reason}")
+            record_permanent_failure(username, platform)
+            return {**failure, "reason": reason}
 
-        SocialMediaAccount.objects.update_or_create(
-            profile=profile,
-            platform="TikTok",
-            defaults={
-                "bio": bio,
-                "followers": followers,
-                "following": following,
-                "posts_collected": 0,
-                "is_private": False,
-                "external_url": "",
-            },
-        )
+        # Private detection heuristic
+        is_private = cfg["detect_private"] and "private" in result.bio.lower()
+
+        # A name or avatar the scrape didn't find keeps the stored value
+        profile_fields = {"full_name": result.full_name, "avatar_url": result.avatar_url}
+        profile_fields = {k: v for k, v in profile_fields.items() if v}
+
+        # --- Update or create Profile + SocialMediaAccount; analysis is queued for after commit.
+        # The transaction only spans these upserts, never the upstream fetch above
+        with transaction.atomic():
+            _upsert_profile_and_account(
+                platform,
+                username,
+                profile_fields=profile_fields,
+                account_fields={
+                    "bio": result.bio,
+                    "followers": result.followers,
+                    "following": result.following,
+                    "posts_collected": result.total_posts,
+                    "is_private": is_private,
+                    "external_url": result.external_url,
+                    "source": result.source,
+                },
+            )
 
-        # --- Behavioral record (no posts yet, but triggers analysis later)
-        ensure_behavioral_record(profile)
-        perform_behavioral_analysis.delay(profile.id)
+        summary = _scrape_summary(platform, username, result)
+        mark_scraped(platform, username, summary)
 
         logger.info(
-            f"✅ TikTok scrape complete for {username} | Followers={followers}, Following={following}, Likes={likes}, Source={source}"
+            f"✅ {platform} scrape complete for {username} | Followers={result.followers}, "
+            f"Following={result.following}, Likes={result.likes}, Source={result.source}"
         )
 
-        return {
-            "success": True,
-            "username": username,
-            "platform": "TikTok",
-            "followers": followers,
-            "following": following,
-            "likes": likes,
-            "source": source,
-        }
+        return summary
+
+    except PermanentScrapeError as e:
+        logger.warning(f"Permanent failure scraping {platform} {username}: {e}")
+        record_permanent_failure(username, platform)
+        mark_not_found(platform, username)
+        return {**failure, "reason": str(e), "permanent": True}
+
+    except RateLimited as e:
+        # Honour the server's Retry-After; fall back to jittered backoff when it gave none
+        if e.wait_seconds:
+            countdown = retry_after_countdown(e.wait_seconds)
+        else:
+            countdown = backoff_countdown(task.request.retries, base=cfg["retry_base"])
+        logger.warning("⏳ %s rate limited for %s, retrying in %.0fs", platform, username, countdown)
+        raise task.retry(exc=e, countdown=countdown, max_retries=cfg["max_retries"])
+
+    except TransientScrapeError as e:
+        logger.warning("Transient failure scraping %s %s: %s", platform, username, e)
+        raise task.retry(
+            exc=e,
+            countdown=backoff_countdown(task.request.retries, base=cfg["retry_base"]),
+            max_retries=cfg["max_retries"],
+        )
 
     except Exception as e:
-        logger.exception(f"❌ TikTok scraping error for {username}: {e}")
-        try:
-            raise self.retry(exc=e, countdown=60 * (2 ** self.request.retries))
-        except self.MaxRetriesExceededError:
-            logger.error(f"Max retries exceeded for TikTok scrape: {username}")
-            return {
-                "success": False,
-                "username": username,
-                "platform": "TikTok",
-                "reason": str(e),
-            }
+        err_msg = str(e)
+        # Lazy %-formatting and no traceback while retrying
+        logger.warning("❌ %s scraping error for %s: %s", platform, username, err_msg)
+
+        wait = None
+        if cfg["retry_rules"] is not None:
+            rule = next((r for r in cfg["retry_rules"] if r[0].search(err_msg)), None)
+            if rule is None:
+                # Not retryable: this is the last chance to see the traceback
+                logger.error("%s scrape for %s gave up", platform, username, exc_info=e)
+                return {**failure, "reason": err_msg}
+            wait = rule[1]
+
+        if wait:
+            countdown = wait + random.randint(-60, 120)
+        else:
+            countdown = backoff_countdown(task.request.retries, base=cfg["retry_base"])
 
+        # Once retries run out, retry() re-raises ``e`` and Celery records the failure with its traceback
+        raise task.retry(exc=e, countdown=countdown, max_retries=cfg["max_retries"])
+    finally:
+        release_scrape_lock(platform, username, owner)
 
 
-# ==========================================================
-# 📸 INSTAGRAM TASK
-# ==========================================================
-@shared_task(bind=True, max_retries=5, default_retry_delay=60, queue="instagram")
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=60, acks_late=True, queue="tiktok")
+def scrape_tiktok_task(self, username: str) -> dict:
+    """
+    Scrape TikTok profile using ScrapingBee + Playwright fallback,
+    save to DB, and trigger behavioral analysis.
+    """
+    return _scrape_profile(self, "TikTok", username)
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=5, default_retry_delay=60, acks_late=True, queue="instagram")
 def scrape_instagram_task(self, username: str) -> dict:
     """Scrape Instagram profile via Playwright/ScrapingBee and save to DB."""
-    try:
-        data = scrape_instagram_profile(username)
+    return _scrape_profile(self, "Instagram", username)
 
-        if not data or (isinstance(data, dict) and data.get("success") is False):
-            reason = data.get("error") if isinstance(data, dict) else "No data"
 
-            logger.warning(f"Permanent failure scraping {username}: {reason}")
+# ==========================================================
+# 📦 BATCH SCRAPE TASK
+# ==========================================================
+def chunks(items, size):
+    """Yield successive ``size``-long slices of ``items``."""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
 
-            with transaction.atomic():
-                profile, _ = Profile.objects.get_or_create(
-                    username=username, platform="Instagram"
-                )
-                profile.full_name = ""
-                profile.avatar_url = None
-                profile.save()
-
-                SocialMediaAccount.objects.update_or_create(
-                    profile=profile,
-                    platform="Instagram",
-                    defaults={
-                        "bio": "",
-                        "followers": 0,
-                        "following": 0,
-                        "posts_collected": 0,
-                        "is_private": True,
-                        "external_url": None,
-                        "source": "error",
-                    },
-                )
 
-            return {
-                "success": False,
-                "username": username,
-                "platform": "Instagram",
-                "reason": reason,
-            }
+def _scrape_in_thread(scraper, platform, username):
+    """Run a scraper on a pool thread and release that thread's DB connection afterwards."""
+    try:
+        wait = rate_limit.take(platform)
+        if wait > 0:
+            # Threads denied together get near-identical waits; spread their wake-ups like throttle() does
+            time.sleep(wait + random.uniform(0, 1))
+        return scraper(username)
+    finally:
+        connection.close()
 
-        # Extract data
-        full_name = data.get("full_name", "")
-        avatar = data.get("avatar")  # FIXED
-        bio = data.get("bio", "")
-        followers = data.get("followers", 0)
-        following = data.get("following", 0)
-        posts_saved = data.get("posts_saved", 0)    # IMPORTANT
-        total_posts = data.get("total_posts", 0)
-        external_url = data.get("external_url")
-        source = data.get("source", "unknown")
 
-        # Private detection heuristic
-        is_private = (
-            "This Account is Private".lower() in bio.lower()
-            or "private" in bio.lower()
+@shared_task(bind=True, ignore_result=True, queue="default")
+def scrape_profiles_batch(self, usernames: list, platform: str) -> dict:
+    """
+    Scrape several usernames for one platform, then upsert all Profile and
+    SocialMediaAccount rows with one INSERT ... ON CONFLICT statement each.
+    """
+    scraper = SCRAPERS[platform]
+    usernames = [u for u in usernames if not recently_scraped(platform, u)]
+    results = {}
+    # Scrapes are network-bound, so overlap them: the batch takes ~max(latency) instead of sum(latency)
+    with ThreadPoolExecutor(max_workers=settings.SCRAPER_CONCURRENCY) as ex:
+        futs = {ex.submit(_scrape_in_thread, scraper, platform, u): u for u in usernames}
+        for fut in as_completed(futs):
+            username = futs[fut]
+            try:
+                result = fut.result()
+            except PermanentScrapeError as e:
+                logger.warning(f"Permanent failure in {platform} batch scrape for {username}: {e}")
+                mark_not_found(platform, username)
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ {platform} batch scrape failed for {username}: {e}")
+                continue
+            if isinstance(result, dict):
+                result = ScrapeResult.from_dict(username, result)
+            if result is not None and result.success:
+                results[username] = result
+
+    if not results:
+        return {"success": False, "platform": platform, "scraped": 0, "requested": len(usernames)}
+
+    detect_private = PLATFORM_CONFIG[platform]["detect_private"]
+
+    # As in _scrape_profile, a name or avatar the scrape didn't find keeps the stored value:
+    # rows are grouped by which of the two they carry and each group only updates those
+    profile_groups = {}
+    for username, r in results.items():
+        fields = {k: v for k, v in {"full_name": r.full_name, "avatar_url": r.avatar_url}.items() if v}
+        profile_groups.setdefault(tuple(fields), []).append(
+            Profile(username=username, platform=platform, **{"full_name": username, **fields})
         )
 
-        # Save to DB
-        with transaction.atomic():
-            profile, _ = Profile.objects.get_or_create(
-                username=username, platform="Instagram"
-            )
-            profile.full_name = full_name
-            profile.avatar_url = avatar
-            profile.posts_collected = total_posts   # FIXED
-            profile.save()
-
-            SocialMediaAccount.objects.update_or_create(
-                profile=profile,
-                platform="Instagram",
-                defaults={
-                    "bio": bio,
-                    "followers": followers,
-                    "following": following,
-                    "posts_collected": total_posts,
-                    "is_private": is_private,
-                    "external_url": external_url,
-                    "source": source,  # NEW
-                },
+    with transaction.atomic():
+        profile_ids = {}
+        for fields, rows in profile_groups.items():
+            profiles = Profile.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["username", "platform"],
+                # Nothing to refresh: a no-op SET still makes PostgreSQL return the existing row's id
+                update_fields=list(fields) or ["username"],
             )
+            # PostgreSQL returns the primary keys of both inserted and updated rows
+            profile_ids.update((p.username, p.pk) for p in profiles)
+
+        SocialMediaAccount.objects.bulk_create(
+            [
+                SocialMediaAccount(
+                    profile_id=profile_ids[username],
+                    platform=platform,
+                    bio=r.bio,
+                    followers=r.followers,
+                    following=r.following,
+                    posts_collected=r.total_posts,
+                    is_private=detect_private and "private" in r.bio.lower(),
+                    external_url=r.external_url,
+                    source=r.source,
+                )
+                for username, r in results.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["profile", "platform"],
+            update_fields=[
+                "bio", "followers", "following", "posts_collected", "is_private", "external_url", "source",
+            ],
+        )
 
-        ensure_behavioral_record(profile)
-        perform_behavioral_analysis.delay(profile.id)
-        logger.info(f"✅ Behavioral record ensured for {username} (Instagram)")
+        BehavioralAnalysis.objects.bulk_create(
+            [BehavioralAnalysis(profile_id=pid) for pid in profile_ids.values()],
+            ignore_conflicts=True,
+        )
 
-        return {
-            "success": True,
-            "username": username,
-            "platform": "Instagram",
-            "posts_saved": posts_saved,
-            "total_posts": total_posts,
-            "data": data,  # NEW
-        }
+        transaction.on_commit(lambda ids=list(profile_ids.values()): enqueue_behavioral_batch(ids), robust=True)
 
-    except Exception as e:
-        err_msg = str(e)
-        logger.exception(f"Instagram scraping failed for {username}: {err_msg}")
+    for username, r in results.items():
+        mark_scraped(platform, username, _scrape_summary(platform, username, r))
 
-        if any(x in err_msg for x in ["Please wait", "401", "429", "temporarily unavailable"]):
-            raise self.retry(exc=e, countdown=120)
+    logger.info(f"✅ {platform} batch scrape saved {len(results)}/{len(usernames)} profiles")
+    return {"success": True, "platform": platform, "scraped": len(results), "requested": len(usernames)}
 
-        return {
-            "success": False,
-            "username": username,
-            "platform": "Instagram",
-            "reason": err_msg,
-        }
+
+BATCH_SIZE = 25
+
+
+def enqueue_scrapes(usernames, platform: str, batch_size: int = BATCH_SIZE):
+    """
+    Fan out scrapes for many usernames with one pipelined broker publish:
+    a batch task per chunk for the SCRAPERS platforms, one scrape task
+    per username for Twitter, which has no batch scraper.
+    """
+    usernames = [u for u in usernames if not known_not_found(platform, u)]
+    if platform in SCRAPERS:
+        signatures = [scrape_profiles_batch.s(chunk, platform) for chunk in chunks(usernames, batch_size)]
+    elif platform == "Twitter":
+        signatures = [scrape_twitter_task.s(u) for u in usernames]
+    else:
+        raise ValueError(f"No scrape task for platform {platform!r}")
+
+    if not signatures:
+        return None
+    return group(signatures).apply_async()
 
 
 # ==========================================================
 # 🧩 BEHAVIORAL ANALYSIS TASK (refactored)
 # ==========================================================
 
-@shared_task(bind=True, queue="default")
+# Upper bound on one analysis run; the lock expires on its own if a worker dies mid-run
+ANALYSIS_LOCK_TTL = 300
+
+# A trigger that lands while a run holds the lock is re-queued this many seconds later,
+# so posts committed after that run read its rows are still analyzed
+ANALYSIS_REQUEUE_DELAY = 30
+
+
+def _analysis_lock_key(profile_id) -> str:
+    return f"behav:{profile_id}"
+
+
+def _analysis_requeue_key(profile_id) -> str:
+    return f"behav:requeued:{profile_id}"
+
+
+def _posts_digest():
+    """
+    Aggregate computing, in PostgreSQL, an md5 over every post's content, timestamp and stored
+    sentiment score in id order: it changes when a post is added, removed or rewritten by an upsert.
+    """
+    post_state = Concat(
+        MD5("content"),
+        Value("|"),
+        Cast("timestamp", TextField()),
+        Value("|"),
+        Cast("sentiment_score", TextField()),
+        output_field=TextField(),
+    )
+    return MD5(StringAgg(post_state, delimiter=",", ordering="id"))
+
+
+def _content_fingerprint(accounts, posts_digest) -> str:
+    """Short digest of what the analysis reads: bios, network counts and the posts' _posts_digest()."""
+    account_state = sorted((a.bio or "", a.followers or 0, a.following or 0) for a in accounts)
+    return hashlib.blake2b(repr((account_state, posts_digest)).encode(), digest_size=8).hexdigest()
+
+
+def _analysis_profiles():
+    """
+    Profiles with what the analysis reads: the analysis row joined in (only its id and
+    fingerprint, not the JSON blobs) and the accounts in one prefetch query.
+    """
+    return (
+        Profile.objects.select_related("behavior_analysis")
+        .only("id", "username", "platform", "behavior_analysis__id", "behavior_analysis__content_fingerprint")
+        .prefetch_related(
+            Prefetch(
+                "socialmediaaccount_set",
+                queryset=SocialMediaAccount.objects.only("profile_id", "bio", "followers", "following"),
+                to_attr="accounts",
+            )
+        )
+    )
+
+
+def _is_unchanged(profile, fingerprint: str) -> bool:
+    """True if the profile's stored analysis was computed from these same inputs."""
+    analysis = getattr(profile, "behavior_analysis", None)
+    return analysis is not None and analysis.content_fingerprint == fingerprint
+
+
+def _analyze(rows, accounts):
+    """
+    Reduce one profile's (content, timestamp, sentiment_score) rows and accounts to the
+    stored analysis fields. Returns (fields, sentiment_distribution, sample_count).
+    """
+    # One pass over the rows feeding running counters, so memory stays at one chunk
+    # of rows however many posts the profile has
+    hour_counts, weekday_counts, keyword_counts = Counter(), Counter(), Counter()
+    pos = neg = total = 0
+    for content, ts, score in rows:
+        total += 1
+        # Reuse the score saved at scrape time; only rows stored without one are scored here
+        if score is None:
+            score = polarity(content)
+        if score > 0.05:
+            pos += 1
+        elif score < -0.05:
+            neg += 1
+
+        if ts:
+            hour_counts[ts.hour] += 1
+            weekday_counts[ts.strftime("%A")] += 1
+
+        # Blank captions skip both regex scans and the lowercase copy
+        if content and not content.isspace():
+            keyword_counts.update(_HASHTAG_RE.findall(content))
+            keyword_counts.update(_WORD_RE.findall(content.lower()))
+
+    followers = sum(int(a.followers or 0) for a in accounts)
+    following = sum(int(a.following or 0) for a in accounts)
+
+    fields = {
+        "avg_post_time": f"{hour_counts.most_common(1)[0][0]}:00" if hour_counts else None,
+        "most_active_days": [day for day, _ in weekday_counts.most_common(3)],
+        "sentiment_score": round((pos - neg) / max(1, total), 3),
+        "top_keywords": dict(keyword_counts.most_common(20)),
+        "network_size": followers + following,
+        # Optional fields left untouched: network_density, geo_locations, interests
+    }
+    sentiment_distribution = {"positive": pos, "neutral": total - pos - neg, "negative": neg}
+    return fields, sentiment_distribution, total
+
+
+# Columns an analysis run writes; analyzed_at is listed so the ON CONFLICT update refreshes it
+_ANALYSIS_FIELDS = [
+    "avg_post_time",
+    "most_active_days",
+    "sentiment_score",
+    "top_keywords",
+    "network_size",
+    "analyzed_at",
+    "content_fingerprint",
+]
+
+
+def _save_analyses(analyses):
+    """
+    Write analysis rows with INSERT ... ON CONFLICT (profile) DO UPDATE of just the computed
+    columns, so a row created concurrently by ensure_behavioral_record can't cause an IntegrityError.
+    """
+    BehavioralAnalysis.objects.bulk_create(
+        analyses,
+        update_conflicts=True,
+        unique_fields=["profile"],
+        update_fields=_ANALYSIS_FIELDS,
+        batch_size=500,
+    )
+
+
+@shared_task(bind=True, ignore_result=True, queue="default")
 def perform_behavioral_analysis(self, profile_id):
     """Analyze user behavior, sentiment, and interests (multi-platform safe)."""
-    try:
-        profile = Profile.objects.get(id=profile_id)
-        analysis, _ = BehavioralAnalysis.objects.get_or_create(profile=profile)
-        # m = SocialMediaAccount.objects.filter(profile=profile, platform=profile.platform).first()
-        accounts = SocialMediaAccount.objects.filter(profile=profile)
-        posts_qs = RawPost.objects.filter(profile=profile).only("timestamp", "content")
-
-        # ----------------- Helpers -----------------
-        def _to_df(qs):
-            if not qs.exists():
-                return pd.DataFrame()
-            df = pd.DataFrame.from_records(list(qs.values("timestamp", "content")))
-            # Drop null timestamps and coerce to datetime
-            if "timestamp" in df.columns:
-                df = df[df["timestamp"].notna()].copy()
-                # ensure timezone-aware; if naive, treat as now (fallback)
-                df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-                df = df[df["timestamp"].notna()]
-            return df
-
-        def compute_posting_patterns(posts_df: pd.DataFrame):
-            if posts_df.empty or "timestamp" not in posts_df.columns:
-                return None, []
-            posts_df["hour"] = posts_df["timestamp"].dt.hour
-            posts_df["weekday"] = posts_df["timestamp"].dt.day_name()
-            # Mode can be empty; guard
-            try:
-                avg_post_time = f"{int(posts_df['hour'].mode().iat[0])}:00"
-            except Exception:
-                avg_post_time = None
-            most_active_days = []
-            if "weekday" in posts_df.columns:
-                most_active_days = posts_df["weekday"].value_counts().head(3).index.tolist()
-            return avg_post_time, most_active_days
-
-        def extract_keywords(text: str):
-            if not text.strip():
-                return {}
-            hashtags = re.findall(r"#(\w+)", text)
-            words = re.findall(r"\b[a-zA-Z]{4,}\b", text.lower())
-            all_keywords = hashtags + words
-            return pd.Series(all_keywords).value_counts().head(20).to_dict() if all_keywords else {}
-
-        def compute_sentiment_distribution(captions):
-            sentiment_distribution = {"positive": 0, "neutral": 0, "negative": 0}
-            sentiments = []
-            for caption in captions:
-                s = round(TextBlob(str(caption)).sentiment.polarity, 3)
-                sentiments.append(s)
-                if s > 0.05:
-                    sentiment_distribution["positive"] += 1
-                elif s < -0.05:
-                    sentiment_distribution["negative"] += 1
-                else:
-                    sentiment_distribution["neutral"] += 1
-            overall_score = round(
-                (sentiment_distribution["positive"] - sentiment_distribution["negative"])
-                / max(1, sum(sentiment_distribution.values())),
-                3,
-            )
-            return sentiments, sentiment_distribution, overall_score
+    # Retries and repeated UI triggers enqueue the same profile more than once;
+    # only one run at a time does the work (Redis SET NX EX, shared by every worker)
+    lock_key = _analysis_lock_key(profile_id)
+    owner = self.request.id
+    if not acquire_lock(lock_key, owner, ANALYSIS_LOCK_TTL):
+        # Don't drop the trigger: run again once the current pass is done. Triggers arriving
+        # while that re-run is already queued are folded into it.
+        if acquire_lock(_analysis_requeue_key(profile_id), owner, ANALYSIS_REQUEUE_DELAY):
+            self.apply_async(args=[profile_id], countdown=ANALYSIS_REQUEUE_DELAY)
+        logger.info(f"⏭️ Behavioral analysis already running for profile {profile_id}, re-queued")
+        return {"success": True, "profile_id": profile_id, "deferred": True}
 
-        # ----------------- Compute -----------------
-        captions = list(posts_qs.values_list("content", flat=True))
-        sentiments, sentiment_distribution, sentiment_score = compute_sentiment_distribution(captions)
+    try:
+        profile = _analysis_profiles().get(id=profile_id)
+        accounts = profile.accounts
+        posts_qs = RawPost.objects.filter(profile_id=profile_id)
 
-        posts_df = _to_df(posts_qs)
-        avg_post_time, most_active_days = compute_posting_patterns(posts_df)
-        keyword_freq = extract_keywords(" ".join(captions))
+        # Nothing new since the last run (e.g. a re-scrape that found the same posts): keep its results
+        posts_digest = posts_qs.aggregate(digest=_posts_digest())["digest"]
+        fingerprint = _content_fingerprint(accounts, posts_digest)
+        if _is_unchanged(profile, fingerprint):
+            logger.info(f"⏭️ Profile {profile.username} ({profile.platform}) unchanged since last analysis, skipping")
+            return {"success": True, "profile": profile.username, "platform": profile.platform, "skipped": True}
 
-        followers = sum(int(a.followers or 0) for a in accounts)
-        following = sum(int(a.following or 0) for a in accounts)
-        network_size = followers + following
+        # ----------------- Compute -----------------
+        rows = posts_qs.values_list("content", "timestamp", "sentiment_score").iterator(chunk_size=500)
+        fields, sentiment_distribution, total = _analyze(rows, accounts)
 
         # ----------------- Persist -----------------
-        analysis.avg_post_time = avg_post_time
-        analysis.most_active_days = most_active_days or []
-        analysis.sentiment_score = sentiment_score
-        analysis.top_keywords = keyword_freq or {}
-        analysis.network_size = network_size
-        # Optional fields left untouched: network_density, geo_locations, interests
-        analysis.analyzed_at = timezone.now()
-        analysis.save()
+        _save_analyses([
+            BehavioralAnalysis(
+                profile_id=profile_id,
+                analyzed_at=timezone.now(),
+                content_fingerprint=fingerprint,
+                **fields,
+            )
+        ])
 
         logger.info(f"✅ Behavioral analysis done for {profile.username} ({profile.platform})")
         # Return includes derived fields we didn't store (for convenience)
@@ -410,9 +820,82 @@ def perform_behavioral_analysis(self, profile_id):
             "profile": profile.username,
             "platform": profile.platform,
             "sentiment_distribution": sentiment_distribution,
-            "computed_samples": len(captions),
+            "computed_samples": total,
         }
 
     except Exception as e:
         logger.exception(f"Behavioral analysis failed for profile {profile_id}: {e}")
         return {"success": False, "error": str(e)}
+    finally:
+        release_lock(lock_key, owner)
+
+
+@shared_task(bind=True, ignore_result=True, queue="default")
+def perform_behavioral_analysis_bulk(self, profile_ids: list):
+    """
+    Analyze many profiles at once (e.g. a scrape batch): one profiles query, one stats
+    query, one streamed posts query for all of them and one upsert for every result.
+    """
+    try:
+        profiles = {p.pk: p for p in _analysis_profiles().filter(pk__in=profile_ids)}
+
+        # Same skip-if-unchanged check as the single task, with the post digests grouped in one query
+        digests = dict(
+            RawPost.objects.filter(profile_id__in=list(profiles))
+            .values("profile_id")
+            .annotate(digest=_posts_digest())
+            .order_by()
+            .values_list("profile_id", "digest")
+        )
+        fingerprints = {}
+        for pid, profile in profiles.items():
+            fingerprint = _content_fingerprint(profile.accounts, digests.get(pid))
+            if not _is_unchanged(profile, fingerprint):
+                fingerprints[pid] = fingerprint
+
+        # Posts of every changed profile in one query, ordered so each profile's rows are contiguous
+        rows = (
+            RawPost.objects.filter(profile_id__in=list(fingerprints))
+            .order_by("profile_id")
+            .values_list("profile_id", "content", "timestamp", "sentiment_score")
+            .iterator(chunk_size=500)
+        )
+        now = timezone.now()
+        analyses = {}
+        for pid, group_rows in groupby(rows, key=itemgetter(0)):
+            fields, _, _ = _analyze((r[1:] for r in group_rows), profiles[pid].accounts)
+            analyses[pid] = BehavioralAnalysis(
+                profile_id=pid, analyzed_at=now, content_fingerprint=fingerprints[pid], **fields
+            )
+        # Changed profiles without posts still get their network fields written
+        for pid in fingerprints.keys() - analyses.keys():
+            fields, _, _ = _analyze((), profiles[pid].accounts)
+            analyses[pid] = BehavioralAnalysis(
+                profile_id=pid, analyzed_at=now, content_fingerprint=fingerprints[pid], **fields
+            )
+
+        _save_analyses(list(analyses.values()))
+
+        logger.info(f"✅ Bulk behavioral analysis done: {len(analyses)} analyzed, {len(profiles) - len(analyses)} unchanged")
+        return {"success": True, "analyzed": len(analyses), "unchanged": len(profiles) - len(analyses)}
+
+    except Exception as e:
+        logger.exception(f"Bulk behavioral analysis failed for profiles {profile_ids}: {e}")
+        return {"success": False, "error": str(e)}
+
+
+ANALYSIS_BATCH_SIZE = 50
+
+
+def enqueue_behavioral_batch(profile_ids):
+    """
+    Queue the analysis for many profiles: one bulk task per ANALYSIS_BATCH_SIZE profiles,
+    all published together, instead of a .delay() and a full task run each.
+    """
+    profile_ids = list(profile_ids)
+    signatures = [
+        perform_behavioral_analysis_bulk.s(chunk) for chunk in chunks(profile_ids, ANALYSIS_BATCH_SIZE)
+    ]
+    if not signatures:
+        return None
+    return group(signatures).apply_async()
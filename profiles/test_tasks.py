@@ -0,0 +1,209 @@
+import subprocess
+import sys
+from unittest import mock
+
+from django.test import TestCase
+
+from profiles import tasks
+from profiles.models import Profile, SocialMediaAccount
+from profiles.utils import instagram_scrapingbee_scraper
+from profiles.utils.scrape_errors import PermanentScrapeError, RateLimited
+from profiles.utils.scrape_result import ScrapeResult
+
+
+class FakeRetry(Exception):
+    """Stands in for celery.exceptions.Retry, which task.retry() raises."""
+
+
+def reraise(exc, **kwargs):
+    """What Celery's retry(exc=e) does once max_retries is reached: raise e itself."""
+    raise exc
+
+
+def fake_task(retries=0):
+    task = mock.Mock()
+    task.request.id = "task-1"
+    task.request.retries = retries
+    task.retry.side_effect = FakeRetry
+    return task
+
+
+class ScrapeProfileTaskTests(TestCase):
+    """_scrape_profile with the scraper, rate limiter and Redis helpers mocked out."""
+
+    def setUp(self):
+        patches = [
+            mock.patch.object(tasks, "recently_scraped", return_value=None),
+            mock.patch.object(tasks, "throttle"),
+            mock.patch.object(tasks, "acquire_scrape_lock", return_value=True),
+            mock.patch.object(tasks, "release_scrape_lock"),
+            mock.patch.object(tasks, "mark_scraped"),
+            mock.patch.object(tasks, "mark_not_found"),
+        ]
+        self.mocks = {p.attribute: p.start() for p in patches}
+        for p in patches:
+            self.addCleanup(p.stop)
+
+    def scrape(self, platform, scraper, task=None):
+        task = task or fake_task()
+        with mock.patch.dict(tasks.SCRAPERS, {platform: scraper}):
+            return tasks._scrape_profile(task, platform, "someuser"), task
+
+    def test_success_upserts_profile_and_account(self):
+        result = ScrapeResult(username="someuser", full_name="Some User", bio="hello", followers=10, following=2)
+        out, task = self.scrape("TikTok", mock.Mock(return_value=result))
+
+        self.assertTrue(out["success"])
+        self.assertEqual(out["followers"], 10)
+        account = SocialMediaAccount.objects.get(profile__username="someuser", platform="TikTok")
+        self.assertEqual((account.bio, account.followers, account.following), ("hello", 10, 2))
+        self.mocks["mark_scraped"].assert_called_once()
+        self.mocks["release_scrape_lock"].assert_called_once_with("TikTok", "someuser", "task-1")
+        task.retry.assert_not_called()
+
+    def test_permanent_error_records_failure_without_retry(self):
+        out, task = self.scrape("Instagram", mock.Mock(side_effect=PermanentScrapeError("not found")))
+
+        self.assertFalse(out["success"])
+        self.assertTrue(out["permanent"])
+        task.retry.assert_not_called()
+        self.mocks["mark_not_found"].assert_called_once_with("Instagram", "someuser")
+        account = SocialMediaAccount.objects.get(profile__username="someuser", platform="Instagram")
+        self.assertTrue(account.is_private)
+        self.assertEqual(account.source, "error")
+
+    def test_empty_parse_is_retried_for_tiktok(self):
+        with self.assertRaises(FakeRetry):
+            self.scrape("TikTok", mock.Mock(return_value={"success": False, "reason": "No data"}))
+        self.assertFalse(Profile.objects.filter(username="someuser").exists())
+
+    def test_empty_parse_is_permanent_for_instagram(self):
+        out, task = self.scrape("Instagram", mock.Mock(return_value={"success": False, "reason": "No data"}))
+
+        self.assertEqual(out, {"success": False, "username": "someuser", "platform": "Instagram", "reason": "No data"})
+        task.retry.assert_not_called()
+        account = SocialMediaAccount.objects.get(profile__username="someuser", platform="Instagram")
+        self.assertEqual(account.source, "error")
+
+    def test_instagram_please_wait_retries_after_cooldown(self):
+        task = fake_task()
+        with self.assertRaises(FakeRetry):
+            self.scrape("Instagram", mock.Mock(side_effect=Exception("Please wait a few minutes")), task)
+        countdown = task.retry.call_args.kwargs["countdown"]
+        self.assertTrue(600 - 60 <= countdown <= 600 + 120)
+        self.assertEqual(task.retry.call_args.kwargs["max_retries"], 5)
+
+    def test_instagram_429_retries_with_backoff(self):
+        task = fake_task(retries=1)
+        with self.assertRaises(FakeRetry):
+            self.scrape("Instagram", mock.Mock(side_effect=Exception("HTTP 429 Too Many Requests")), task)
+        countdown = task.retry.call_args.kwargs["countdown"]
+        # backoff_countdown(1, base=120): 240s spread over [120, 360]
+        self.assertTrue(120 <= countdown <= 360)
+
+    def test_rate_limited_retries_after_retry_after(self):
+        task = fake_task()
+        with self.assertRaises(FakeRetry):
+            self.scrape("Instagram", mock.Mock(side_effect=RateLimited(120, "429")), task)
+        countdown = task.retry.call_args.kwargs["countdown"]
+        self.assertTrue(120 <= countdown <= 125)
+
+    def test_retry_after_is_clamped(self):
+        for wait, low, high in ((5000, tasks.RETRY_AFTER_CAP, tasks.RETRY_AFTER_CAP + 5), (1, 5, 10)):
+            task = fake_task()
+            with self.assertRaises(FakeRetry):
+                self.scrape("Instagram", mock.Mock(side_effect=RateLimited(wait, "429")), task)
+            countdown = task.retry.call_args.kwargs["countdown"]
+            self.assertTrue(low <= countdown <= high, (wait, countdown))
+
+    def test_instagram_unmatched_error_gives_up(self):
+        out, task = self.scrape("Instagram", mock.Mock(side_effect=Exception("parser exploded")))
+
+        self.assertEqual(out["reason"], "parser exploded")
+        task.retry.assert_not_called()
+
+    def test_tiktok_retries_every_unexpected_error(self):
+        task = fake_task()
+        with self.assertRaises(FakeRetry):
+            self.scrape("TikTok", mock.Mock(side_effect=Exception("parser exploded")), task)
+        self.assertEqual(task.retry.call_args.kwargs["max_retries"], 3)
+
+    def test_exhausted_retries_propagate_the_error(self):
+        task = fake_task(retries=3)
+        task.retry.side_effect = reraise
+        error = Exception("still broken")
+        with self.assertRaises(Exception) as ctx:
+            self.scrape("TikTok", mock.Mock(side_effect=error), task)
+
+        self.assertIs(ctx.exception, error)
+        self.mocks["release_scrape_lock"].assert_called_once_with("TikTok", "someuser", "task-1")
+
+    def test_concurrent_scrape_is_skipped(self):
+        self.mocks["acquire_scrape_lock"].return_value = False
+        scraper = mock.Mock()
+        out, task = self.scrape("Instagram", scraper)
+
+        self.assertEqual(
+            out,
+            {"success": True, "username": "someuser", "platform": "Instagram", "skipped": True, "reason": "concurrent"},
+        )
+        scraper.assert_not_called()
+        self.mocks["release_scrape_lock"].assert_not_called()
+
+
+
+class ScrapeProfilesBatchTests(TestCase):
+    def setUp(self):
+        for name in ("recently_scraped", "mark_scraped", "mark_not_found", "enqueue_behavioral_batch"):
+            p = mock.patch.object(tasks, name, return_value=None)
+            p.start()
+            self.addCleanup(p.stop)
+        p = mock.patch.object(tasks.rate_limit, "take", return_value=0)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def run_batch(self, results):
+        with mock.patch.dict(tasks.SCRAPERS, {"Instagram": lambda u: results[u]}):
+            return tasks.scrape_profiles_batch.run(list(results), "Instagram")
+
+    def test_missing_name_or_avatar_keeps_stored_values(self):
+        Profile.objects.create(
+            username="known", platform="Instagram", full_name="Known Name", avatar_url="https://img/known.jpg"
+        )
+        out = self.run_batch({
+            "known": ScrapeResult(username="known", bio="This account is private", external_url="https://k.example"),
+            "fresh": ScrapeResult(username="fresh", full_name="Fresh", avatar_url="https://img/fresh.jpg"),
+        })
+
+        self.assertEqual(out["scraped"], 2)
+        known = Profile.objects.get(username="known")
+        self.assertEqual((known.full_name, known.avatar_url), ("Known Name", "https://img/known.jpg"))
+        fresh = Profile.objects.get(username="fresh")
+        self.assertEqual((fresh.full_name, fresh.avatar_url), ("Fresh", "https://img/fresh.jpg"))
+        account = SocialMediaAccount.objects.get(profile=known, platform="Instagram")
+        self.assertTrue(account.is_private)
+        self.assertEqual(account.external_url, "https://k.example")
+
+
+class InstagramFetchTests(TestCase):
+    def test_profile_page_429_raises_rate_limited(self):
+        client = mock.Mock()
+        client.get.return_value = mock.Mock(status_code=429, headers={"Retry-After": "90"}, text="")
+        with mock.patch.object(instagram_scrapingbee_scraper, "_get_client", return_value=client):
+            with self.assertRaises(RateLimited) as ctx:
+                instagram_scrapingbee_scraper._fetch_instagram_html("someuser")
+
+        self.assertEqual(ctx.exception.wait_seconds, 90)
+        # The first region's 429 stops the loop; the other regions are not tried
+        client.get.assert_called_once()
+
+
+class WorkerImportTests(TestCase):
+    def test_tasks_module_does_not_load_numpy_or_pandas(self):
+        # A fresh interpreter: this test process has long since imported both through the views
+        code = (
+            "import sys, django; django.setup(); import profiles.tasks; "
+            "print(sorted(m for m in ('numpy', 'pandas') if m in sys.modules))"
+        )
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip().splitlines()[-1], "[]")
@@ -1,8 +1,11 @@
 import io
 import base64
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, ExtractIsoWeekDay
 from profiles.models import RawPost
 
 def generate_activity_heatmap(username, platform="Twitter"):
@@ -17,27 +20,24 @@ def generate_activity_heatmap(username, platform="Twitter"):
         posts = RawPost.objects.filter(profile__username=username)
     else:
         posts = RawPost.objects.filter(profile__username=username, profile__platform=platform)
-    timestamps = [p.timestamp for p in posts if p.timestamp]
+    # PostgreSQL does the (weekday, hour) tally: at most 7 × 24 rows come back,
+    # however many posts the profile has
+    cell_counts = list(
+        posts.filter(timestamp__isnull=False)
+        .annotate(dow=ExtractIsoWeekDay("timestamp"), hour=ExtractHour("timestamp"))
+        .values_list("dow", "hour")
+        .annotate(count=Count("id"))
+    )
 
-    if not timestamps:
+    if not cell_counts:
         return None
 
-    # Build DataFrame from timestamps
-    df = pd.DataFrame({"timestamp": timestamps})
-
-    # Fix timezone & coercion
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = df[df["timestamp"].notna()]
-
-    df["day"] = df["timestamp"].dt.day_name()
-    df["hour"] = df["timestamp"].dt.hour
-
-    # Define weekday order
+    # Rows = days (Monday first, ISO weekday 1), columns = hours, values = post counts
+    cells = np.zeros((7, 24), dtype=np.int64)
+    for dow, hour, count in cell_counts:
+        cells[dow - 1, hour] = count
     day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-    df["day"] = pd.Categorical(df["day"], categories=day_order, ordered=True)
-
-    # Create pivot table: rows = days, columns = hours, values = post counts
-    pivot = df.pivot_table(index="day", columns="hour", aggfunc="size", fill_value=0)
+    pivot = pd.DataFrame(cells, index=day_order, columns=range(24))
 
     # --- Plot setup ---
     plt.figure(figsize=(10, 5))
@@ -1,5 +1,15 @@
 import json
-import pandas as pd
+from collections import Counter
+from datetime import datetime
+
+# Engagement counters summed per post; platforms lacking a field just contribute 0
+_ENGAGEMENT_FIELDS = ("likes", "comments", "shares", "stars", "forks")
+
+
+def _count(value):
+    """Numeric engagement value, treating missing or non-numeric values as 0."""
+    return value if isinstance(value, (int, float)) else 0
+
 
 def generate_engagement_timeline(posts):
     """
@@ -15,48 +25,22 @@ def generate_engagement_timeline(posts):
     if not posts:
         return "[]", "[]"
 
-    # --- Build DataFrame ---
-    df = pd.DataFrame(posts)
-
-    # Ensure timestamp column exists
-    if "timestamp" not in df.columns:
-        return "[]", "[]"
-
-    # Convert timestamps to datetime safely
-    df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce", utc=True)
-    df = df[df["timestamp"].notna()]
+    # Sum engagement per day label in one pass; a Counter is all this needs, no DataFrame
+    engagement_by_date = Counter()
+    for post in posts:
+        ts = post.get("timestamp")
+        if not isinstance(ts, datetime):
+            continue
+        engagement_by_date[ts.strftime("%b %d")] += sum(_count(post.get(f)) for f in _ENGAGEMENT_FIELDS)
 
-    if df.empty:
+    if not engagement_by_date:
         return "[]", "[]"
 
-    # --- Normalize engagement fields ---
-    df["likes"] = pd.to_numeric(df.get("likes", 0), errors="coerce").fillna(0)
-    df["comments"] = pd.to_numeric(df.get("comments", 0), errors="coerce").fillna(0)
-
-    # TikTok extra fields (optional)
-    df["shares"] = pd.to_numeric(df.get("shares", 0), errors="coerce").fillna(0)
-
-    # GitHub fields (optional)
-    df["stars"] = pd.to_numeric(df.get("stars", 0), errors="coerce").fillna(0)
-    df["forks"] = pd.to_numeric(df.get("forks", 0), errors="coerce").fillna(0)
-
-    # Engagement formula (covering all platforms)
-    df["engagement"] = (
-        df["likes"] +
-        df["comments"] +
-        df["shares"] +
-        df["stars"] +
-        df["forks"]
-    )
-
-    # Extract date label
-    df["date"] = df["timestamp"].dt.strftime("%b %d")
-
-    # Group by date (sum engagements for same day)
-    grouped = df.groupby("date")["engagement"].sum().reset_index()
+    # Same label order the previous groupby produced
+    dates = sorted(engagement_by_date)
 
     # Convert to JSON for charts
-    labels_json = json.dumps(list(grouped["date"]))
-    values_json = json.dumps(list(grouped["engagement"]))
+    labels_json = json.dumps(dates)
+    values_json = json.dumps([engagement_by_date[d] for d in dates])
 
     return labels_json, values_json
@@ -1,4 +1,5 @@
 import os
+import heapq
 import networkx as nx
 from pyvis.network import Network
 import spacy
@@ -14,6 +15,13 @@ try:
 except OSError:
     raise RuntimeError("spaCy model 'en_core_web_sm' is missing. Run: python -m spacy download en_core_web_sm")
 
+# Per-post patterns, compiled once at import
+_HASHTAG_RE = re.compile(r"#\w+")
+_MENTION_RE = re.compile(r"@\w+")
+_CHALLENGE_RE = re.compile(r"[A-Za-z0-9]+Challenge")
+_SOUND_RE = re.compile(r"[A-Za-z0-9]+Sound")
+_REPO_RE = re.compile(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+")
+
 
 # ======================================================
 # Helper: Extract platform-specific entities
@@ -34,8 +42,8 @@ def extract_entities_from_text(text):
     ])
 
     # Hashtags and mentions
-    ents.extend(re.findall(r"#\w+", text))
-    ents.extend(re.findall(r"@\w+", text))
+    ents.extend(_HASHTAG_RE.findall(text))
+    ents.extend(_MENTION_RE.findall(text))
 
     # Capitalized keyword candidates (names, brands)
     ents.extend([
@@ -44,11 +52,11 @@ def extract_entities_from_text(text):
     ])
 
     # TikTok style keywords (e.g., sounds, challenges)
-    ents.extend(re.findall(r"[A-Za-z0-9]+Challenge", text))
-    ents.extend(re.findall(r"[A-Za-z0-9]+Sound", text))
+    ents.extend(_CHALLENGE_RE.findall(text))
+    ents.extend(_SOUND_RE.findall(text))
 
     # GitHub style entities (Repos, orgs)
-    ents.extend(re.findall(r"[A-Za-z0-9_.-]+/[A-Za-z0-9_.-]+", text))   # repo names
+    ents.extend(_REPO_RE.findall(text))   # repo names
 
     # dedupe
     return list(set(ents))
@@ -73,18 +81,18 @@ def generate_entity_graph(username, platform="Twitter"):
     else:
         posts = RawPost.objects.filter(profile__username=username, profile__platform=platform)
 
-    if not posts.exists():
+    # Only the caption text is used, fetched once; an empty result doubles as the "no posts" check
+    captions = [c for c in posts.exclude(content="").values_list("content", flat=True) if c]
+    if not captions:
         print(f"⚠️ No posts found for {username} on {platform}.")
         return None, []
 
     G = nx.Graph()
     print(f"🧠 Extracting entities for {username} on {platform}...")
 
-    for post in posts:
-        if not post.content:
-            continue
-        
-        entities = extract_entities_from_text(post.content)
+    for content in captions:
+
+        entities = extract_entities_from_text(content)
 
         # Pairwise co-occurrence edges
         for i in range(len(entities)):
@@ -148,12 +156,12 @@ def generate_entity_graph(username, platform="Twitter"):
         node["size"] = 15 + degree * 2.5
         node["title"] = f"<b>{node_id}</b><br>Connections: {degree}<br>Cluster: {cluster_id}"
 
+    # Rank each community's entities once with a top-5 heap (no full sort):
+    # the first 3 get labels, all 5 go into the cluster summary
+    top_by_comm = [heapq.nlargest(5, G.subgraph(comm).degree, key=lambda x: x[1]) for comm in communities]
+
     # Label top nodes
-    label_nodes = []
-    for comm in communities:
-        subgraph = G.subgraph(comm)
-        top_nodes = sorted(subgraph.degree, key=lambda x: x[1], reverse=True)[:3]
-        label_nodes.extend([n for n, _ in top_nodes])
+    label_nodes = {n for top in top_by_comm for n, _ in top[:3]}
 
     for node in net.nodes:
         if node["id"] in label_nodes:
@@ -165,10 +173,8 @@ def generate_entity_graph(username, platform="Twitter"):
     # Generate textual cluster summaries
     # ======================================================
     cluster_summaries = []
-    for i, comm in enumerate(communities):
-        subgraph = G.subgraph(comm)
-        top_nodes = sorted(subgraph.degree, key=lambda x: x[1], reverse=True)[:5]
-        top_list = ", ".join([n for n, _ in top_nodes])
+    for i, top_nodes in enumerate(top_by_comm):
+        top_list = ", ".join(n for n, _ in top_nodes)
         summary = f"Cluster {i+1}: Top entities — {top_list}"
         cluster_summaries.append(summary)
 
@@ -1,9 +1,15 @@
 import requests
+from requests.adapters import HTTPAdapter
 from profiles.models import Profile, SocialMediaAccount
+
+# Pooled session so repeated lookups reuse the connection to api.github.com
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+
 def scrape_github_profile(username):
     url = f"https://api.github.com/users/{username}"
     try: 
-        response = requests.get(url)
+        response = _SESSION.get(url, timeout=(3.05, 15))
         if response.status_code == 200:
             data = response.json()
             return {
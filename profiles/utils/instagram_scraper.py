@@ -4,7 +4,7 @@ import os
 import tempfile
 from django.conf import settings
 from django.utils import timezone
-from textblob import TextBlob
+from profiles.utils.sentiment import polarity
 from profiles.models import Profile, RawPost, SocialMediaAccount
 
 # ✅ Import your ScrapingBee fallback
@@ -32,8 +32,9 @@ def get_instaloader() -> instaloader.Instaloader:
 
     try:
         # 1️⃣ Load local session (works in local dev)
-        if hasattr(settings, "SESSION_FILE") and os.path.exists(settings.SESSION_FILE):
-            L.load_session_from_file(settings.IG_LOGIN, filename=settings.SESSION_FILE)
+        session_file = getattr(settings, "SESSION_FILE", None)
+        if session_file and os.path.exists(session_file):
+            L.load_session_from_file(settings.IG_LOGIN, filename=session_file)
             logger.info("💻 Loaded local Instagram session file.")
             session_loaded = True
 
@@ -91,6 +92,7 @@ def scrape_instagram_profile(username: str, max_posts: int = 10) -> dict | None:
         # --- Collect posts ---
         posts_data = []
         count = 0
+        now = timezone.now()
         for post in profile.get_posts():
             if count >= max_posts:
                 break
@@ -98,8 +100,8 @@ def scrape_instagram_profile(username: str, max_posts: int = 10) -> dict | None:
             caption = post.caption or ""
             likes = getattr(post, "likes", 0)
             comments = getattr(post, "comments", 0)
-            timestamp = post.date_utc or timezone.now()
-            sentiment = round(TextBlob(caption).sentiment.polarity, 3) if caption else 0.0
+            timestamp = post.date_utc or now
+            sentiment = round(polarity(caption), 3)
 
             posts_data.append({
                 "post_id": post.shortcode,
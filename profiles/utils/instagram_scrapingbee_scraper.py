@@ -3,9 +3,16 @@ from bs4 import BeautifulSoup
 from django.conf import settings
 from scrapingbee import ScrapingBeeClient
 from datetime import datetime, timezone as dt_timezone
-from profiles.models import Profile, SocialMediaAccount, RawPost
+from profiles.models import SocialMediaAccount, RawPost
+from profiles.utils.scrape_errors import (
+    PermanentScrapeError,
+    RateLimited,
+    TransientScrapeError,
+    parse_retry_after,
+)
 from django.utils import timezone as dj_timezone
-from textblob import TextBlob
+from profiles.utils.sentiment import polarity
+from profiles.utils.upserts import upsert_account, upsert_profile
 logger = logging.getLogger(__name__)
 
 # ============================================================
@@ -87,11 +94,21 @@ def _fetch_instagram_html(username: str) -> tuple[str | None, str]:
                         "Referer": "https://www.instagram.com/",
                     },
                 )
+                if resp.status_code == 404:
+                    raise PermanentScrapeError(f"Instagram user @{username} not found")
+                if resp.status_code == 429:
+                    # Every region goes through the same quota: stop here and retry the task after Retry-After
+                    raise RateLimited(
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                        f"Instagram returned 429 for @{username}",
+                    )
                 if resp.status_code == 200 and ("og:title" in resp.text or "og:description" in resp.text):
                     logger.info(f"✅ ScrapingBee (region={region}) worked for @{username}")
                     return resp.text, f"ScrapingBee ({region})"
                 else:
                     logger.warning(f"⚠️ Instagram returned {resp.status_code} region={region} for @{username}")
+            except (PermanentScrapeError, RateLimited):
+                raise
             except Exception as e:
                 logger.warning(f"⚠️ ScrapingBee region {region} failed for @{username}: {e}")
 
@@ -169,6 +186,12 @@ def _to_int_safe(value: str) -> int:
         return 0
 
 import requests
+from requests.adapters import HTTPAdapter
+
+# Pooled session reused by every task in this worker process (saves a TCP+TLS handshake per call)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32, max_retries=0))
+_SESSION.headers.update({"User-Agent": "Mozilla/5.0"})
 
 def fetch_recent_posts_api(username: str):
     """
@@ -178,12 +201,16 @@ def fetch_recent_posts_api(username: str):
     url = f"https://www.instagram.com/api/v1/users/web_profile_info/?username={username}"
 
     headers = {
-        "User-Agent": "Mozilla/5.0",
         "X-IG-App-ID": "936619743392459"
     }
 
     try:
-        resp = requests.get(url, headers=headers)
+        resp = _SESSION.get(url, headers=headers, timeout=(3.05, 15))
+        if resp.status_code == 429:
+            # Posts are optional: keep the profile that was already scraped and skip them this run
+            wait = parse_retry_after(resp.headers.get("Retry-After"))
+            logger.warning(f"⏳ Instagram API rate limited posts for {username} (Retry-After {wait}s), skipping posts")
+            return []
         if resp.status_code != 200:
             logger.warning(f"⚠️ Instagram API returned {resp.status_code} for {username}")
             return []
@@ -203,6 +230,7 @@ def fetch_recent_posts_api(username: str):
                 caption = cap_edges[0].get("node", {}).get("text", "")
 
             posts.append({
+                "post_id": node.get("shortcode") or node.get("id"),
                 "caption": caption,
                 "timestamp": node.get("taken_at_timestamp"),
                 "likes": node.get("edge_liked_by", {}).get("count", 0),
@@ -399,39 +427,58 @@ def scrape_instagram_profile(username: str) -> dict:
     """ 
     html, source = _fetch_instagram_html(username)
     if not html:
-        return {"success": False, "error": f"Failed to fetch HTML: {source}"}
+        raise TransientScrapeError(f"Failed to fetch HTML: {source}")
     parsed = parse_instagram_html(html)
 
     ig_username = parsed.get("username") or username
-    full_name = parsed.get("full_name") or ig_username
+    full_name = parsed.get("full_name") or ""
     avatar = parsed.get("avatar") or ""
     bio = parsed.get("bio") or ""
     followers = parsed.get("followers") or 0
     following = parsed.get("following") or 0
     recent_posts = fetch_recent_posts_api(ig_username)
 
-    # 1️⃣ Upsert Profile
-    profile, _ = Profile.objects.get_or_create(
-        username=ig_username,
-        platform="Instagram",
-        defaults={"full_name": full_name, "avatar_url": avatar},
-    )
-    # keep profile fresh
-    profile.full_name = full_name or profile.full_name
-    profile.avatar_url = avatar or profile.avatar_url
-    profile.save(update_fields=["full_name", "avatar_url"])
+    # 1️⃣ Upsert Profile (one INSERT ... ON CONFLICT; a name or avatar that wasn't scraped
+    # never overwrites the stored one, and a new row falls back to the username)
+    profile_fields = {}
+    if full_name:
+        profile_fields["full_name"] = full_name
+    if avatar:
+        profile_fields["avatar_url"] = avatar
+    profile = upsert_profile(ig_username, "Instagram", profile_fields, insert_only={"full_name": ig_username})
+    profile_id = profile.id
     # 2️⃣ Upsert SocialMediaAccount
-    sm_account, _ = SocialMediaAccount.objects.get_or_create(
-        profile=profile,
-        platform="Instagram",
-    )
-    sm_account.bio = bio
-    sm_account.followers = followers
-    sm_account.following = following
-    sm_account.save()
-    # 3️⃣ Save posts into RawPost with sentiment + timestamp
-    saved_count = 0
-    for p in recent_posts[:50]:   # limit to 50 for safety
+    upsert_account(profile, "Instagram", {"bio": bio, "followers": followers, "following": following})
+    # 3️⃣ Save posts into RawPost with sentiment + timestamp (one multi-row upsert)
+    new_posts = []
+    now = dj_timezone.now()  # fallback timestamp, taken once for the batch
+    batch = recent_posts[:50]   # limit to 50 for safety
+    # Stored captions, read in one query, for the duplicate check of posts without an id
+    stored_captions = []
+    if any(not p.get("post_id") for p in batch):
+        stored_captions = [
+            c.lower()
+            for c in RawPost.objects.filter(profile_id=profile_id, platform="Instagram")
+            .values_list("content", flat=True)
+            if c
+        ]
+    # Rows saved before posts had ids: caption prefix -> row id, so a re-scrape fills in their
+    # post_id instead of inserting a second copy (same matching as the Twitter legacy_prefixes)
+    legacy_rows = {}
+    for row_id, content in RawPost.objects.filter(
+        profile_id=profile_id, platform="Instagram", post_id__isnull=True
+    ).values_list("id", "content"):
+        if content:
+            legacy_rows.setdefault(content[:60].lower(), row_id)
+    stored_ids = set()
+    if legacy_rows:
+        stored_ids = set(
+            RawPost.objects.filter(
+                profile_id=profile_id, post_id__in=[p["post_id"] for p in batch if p.get("post_id")]
+            ).values_list("post_id", flat=True)
+        )
+    backfilled = []
+    for p in batch:
         caption = (p.get("caption") or "").strip()
         if not caption:
             continue
@@ -439,37 +486,48 @@ def scrape_instagram_profile(username: str) -> dict:
         ts = None
         if raw_ts:
             try:
-                ts = datetime.fromtimestamp(int(raw_ts), tz=dj_timezone.utc)
+                ts = datetime.fromtimestamp(int(raw_ts), tz=dt_timezone.utc)
             except Exception:
-                ts = dj_timezone.now()
+                ts = now
         else:
-            ts = dj_timezone.now()
+            ts = now
         likes = p.get("likes") or 0
         comments = p.get("comments") or 0
-        # crude duplicate check by prefix of caption
-        if RawPost.objects.filter(
-            profile=profile,
-            platform="Instagram",
-            content__icontains=caption[:60],
-        ).exists():
-            continue
-        polarity = round(TextBlob(caption).sentiment.polarity, 3)
-        RawPost.objects.create(
-            profile=profile,
+        post_id = p.get("post_id")
+        prefix = caption[:60].lower()
+        if post_id:
+            legacy_id = legacy_rows.pop(prefix, None) if post_id not in stored_ids else None
+            if legacy_id is not None:
+                backfilled.append(RawPost(id=legacy_id, post_id=post_id, likes=likes, comments=comments))
+                continue
+        else:
+            # crude duplicate check by prefix of caption (only when Instagram gave no post id),
+            # against stored posts and the ones already taken from this batch
+            if any(prefix in c for c in stored_captions):
+                continue
+            stored_captions.append(caption.lower())
+        sentiment = round(polarity(caption), 3)
+        new_posts.append(RawPost(
+            profile_id=profile_id,
             platform="Instagram",
+            post_id=post_id,
             content=caption,
             timestamp=ts,
             likes=likes,
             comments=comments,
-            sentiment_score=polarity,
-        )
-        saved_count += 1
-    total_posts = RawPost.objects.filter(profile=profile, platform="Instagram").count()
-    profile.posts_count = total_posts
-    profile.save(update_fields=["posts_count"])
-
-    sm_account.posts_collected = total_posts
-    sm_account.save(update_fields=["posts_collected"])
+            sentiment_score=sentiment,
+        ))
+    RawPost.objects.bulk_update(backfilled, ["post_id", "likes", "comments"], batch_size=500)
+    RawPost.objects.bulk_create(
+        new_posts,
+        update_conflicts=True,
+        unique_fields=["profile", "post_id"],
+        update_fields=["likes", "comments", "content", "sentiment_score"],
+        batch_size=500,
+    )
+    saved_count = len(new_posts)
+    total_posts = RawPost.objects.filter(profile_id=profile_id, platform="Instagram").count()
+    SocialMediaAccount.objects.filter(profile_id=profile_id, platform="Instagram").update(posts_collected=total_posts)
     logger.info(
         f"💾 Instagram @{ig_username}: saved {saved_count}/{len(recent_posts)} posts; "
         f"followers={followers}, following={following}, source={source}"
@@ -1,19 +1,24 @@
 import re
 from collections import Counter
+from itertools import chain
 from profiles.utils.wordcloud import generate_wordcloud
 
+# Same hashtag / word patterns perform_behavioral_analysis uses, compiled once (applied to lowercased text)
+_HASHTAG_RE = re.compile(r"#(\w+)")
+_WORD_RE = re.compile(r"\b[a-z]{4,}\b")
+
 def extract_keywords(posts, analysis=None):
     """Extract or fallback to computed keywords."""
     top_keywords = getattr(analysis, "top_keywords", None) if analysis else None
     if top_keywords:
         return top_keywords
 
-    words = []
+    words = Counter()
     for p in posts:
         content = (p.get("content") or "").lower()
-        words += re.findall(r"#(\w+)", content)
-        words += re.findall(r"\b[a-zA-Z]{4,}\b", content)
-    freq = Counter(words).most_common(20)
+        words.update(_HASHTAG_RE.findall(content))
+        words.update(_WORD_RE.findall(content))
+    freq = words.most_common(20)
     return {k: v for k, v in freq}
 
 
@@ -22,5 +27,5 @@ def generate_wordcloud_image(posts, profile, top_keywords):
     bios = [s.bio for s in profile.socialmediaaccount_set.all() if s.bio]
     captions = [p.get("content", "") for p in posts if p.get("content")]
     weighted_keywords = [(k + " ") * max(int(v), 1) for k, v in top_keywords.items()]
-    combined_text = " ".join(captions + bios + weighted_keywords)
+    combined_text = " ".join(chain(captions, bios, weighted_keywords))
     return generate_wordcloud(combined_text) if combined_text.strip() else None
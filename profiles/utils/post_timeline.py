@@ -19,20 +19,18 @@ def generate_post_timeline(username: str, platforms=None):
         profile__platform=platforms
     ).exclude(timestamp=None).order_by("timestamp")
 
-    if not posts.exists():
+    # --- 2️⃣ Convert to DataFrame ---
+    # Tuples straight from values_list, not a dict per row (roughly half the memory)
+    df = pd.DataFrame.from_records(
+        list(posts.values_list("timestamp", "sentiment_score", "content", "platform")),
+        columns=["timestamp", "sentiment", "content", "platform"],
+        coerce_float=False,
+    )
+    if df.empty:
         return None  # nothing to visualize
 
-    # --- 2️⃣ Convert to DataFrame ---
-    data = [
-        {
-            "timestamp": p.timestamp,
-            "sentiment": p.sentiment_score if p.sentiment_score is not None else 0.0,
-            "content": (p.content or "")[:120],
-            "platform": p.platform,
-        }
-        for p in posts
-    ]
-    df = pd.DataFrame(data)
+    df["sentiment"] = df["sentiment"].fillna(0.0)
+    df["content"] = df["content"].fillna("")
     df["date"] = df["timestamp"].dt.date
 
     # --- 3️⃣ Aggregate per day ---
@@ -0,0 +1,77 @@
+import logging
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Known upstream ceilings per platform: (tokens per second, burst size)
+RATE_LIMITS = {
+    "Instagram": (30 / 60, 10),
+    "TikTok": (200 / 60, 20),
+    "Twitter": (60 / 60, 10),
+}
+
+# Classic token bucket, refilled lazily from Redis server time.
+# Returns the seconds the caller must wait (0 when a token was taken).
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - ts) * rate)
+
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait = (requested - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) * 2)
+return tostring(wait)
+"""
+
+_client = None
+_script = None
+
+
+def redis_client() -> redis.Redis:
+    """
+    The process-wide client for the Celery broker's Redis: state that web and
+    worker hosts must agree on (limits, locks, markers) lives there, not in the per-host cache.
+    """
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.CELERY_BROKER_URL)
+    return _client
+
+
+def _token_bucket():
+    global _script
+    if _script is None:
+        _script = redis_client().register_script(_TOKEN_BUCKET_LUA)
+    return _script
+
+
+def take(platform: str, tokens: int = 1) -> float:
+    """
+    Take ``tokens`` from the platform's shared bucket.
+    Returns how many seconds to wait before calling upstream (0.0 = go now).
+    Fails open: if Redis is unreachable the scrape is not throttled.
+    """
+    limit = RATE_LIMITS.get(platform)
+    if limit is None:
+        return 0.0
+    rate, burst = limit
+    try:
+        return float(_token_bucket()(keys=[f"rl:{platform.lower()}"], args=[rate, burst, tokens]))
+    except redis.RedisError as e:
+        logger.warning(f"⚠️ Rate limiter unavailable for {platform}: {e}")
+        return 0.0
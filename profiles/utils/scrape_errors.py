@@ -0,0 +1,34 @@
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+
+
+class PermanentScrapeError(Exception):
+    """The account can't be scraped (not found, private); retrying won't help."""
+
+
+class TransientScrapeError(Exception):
+    """A temporary upstream failure (429, 5xx, network); worth retrying."""
+
+
+class RateLimited(TransientScrapeError):
+    """Upstream answered 429; ``wait_seconds`` comes from its Retry-After header (0 if absent)."""
+
+    def __init__(self, wait_seconds: int = 0, message: str = "Rate limited"):
+        super().__init__(message)
+        self.wait_seconds = wait_seconds
+
+
+def parse_retry_after(value) -> int:
+    """Parse a Retry-After header (delta-seconds or HTTP-date, RFC 7231) into seconds."""
+    if not value:
+        return 0
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt_timezone.utc)
+    return max(0, int((retry_at - datetime.now(dt_timezone.utc)).total_seconds()))
@@ -0,0 +1,28 @@
+from dataclasses import dataclass, fields
+
+
+@dataclass(slots=True)
+class ScrapeResult:
+    """What a profile scraper hands back to the tasks; slots keep attribute access cheap at batch scale."""
+
+    username: str
+    success: bool = True
+    full_name: str = ""
+    avatar_url: str | None = None
+    bio: str = ""
+    followers: int = 0
+    following: int = 0
+    likes: int = 0
+    total_posts: int = 0
+    external_url: str | None = None
+    source: str = "unknown"
+    reason: str = ""
+
+    @classmethod
+    def from_dict(cls, username: str, data: dict) -> "ScrapeResult":
+        """Adapt a scraper's legacy result dict (``avatar`` or ``avatar_url``, ``error`` or ``reason``)."""
+        known = {f.name for f in fields(cls)} - {"username"}
+        result = cls(username=username, **{k: v for k, v in data.items() if k in known and v is not None})
+        result.avatar_url = data.get("avatar") or data.get("avatar_url") or ""
+        result.reason = data.get("reason") or data.get("error") or ""
+        return result
@@ -0,0 +1,20 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _vader():
+    """Load VADER and its lexicon on first use rather than at worker import time."""
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    return SentimentIntensityAnalyzer()
+
+
+@lru_cache(maxsize=4096)
+def _polarity(text: str) -> float:
+    # Re-scrapes and re-analyses see the same captions/bios again; score each text once per worker
+    return _vader().polarity_scores(text)["compound"]
+
+
+def polarity(text) -> float:
+    """VADER compound score in [-1, 1] (same range TextBlob polarity used)."""
+    return _polarity(str(text)) if text else 0.0
+
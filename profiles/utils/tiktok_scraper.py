@@ -4,11 +4,11 @@ import json
 import random
 import logging
 from datetime import datetime, timezone as dt_timezone
-from textblob import TextBlob
 from scrapingbee import ScrapingBeeClient
 from django.conf import settings
 from profiles.models import Profile, SocialMediaAccount, RawPost
-from playwright.sync_api import sync_playwright
+from profiles.utils.scrape_errors import PermanentScrapeError, TransientScrapeError
+from profiles.utils.scrape_result import ScrapeResult
 from bs4 import BeautifulSoup
 
 logger = logging.getLogger(__name__)
@@ -35,6 +35,9 @@ def _get_client():
 # ============================================================
 def _fetch_with_playwright(username: str) -> str:
     """Launch headless Chromium to render TikTok page and return HTML."""
+    # Imported here: only the fallback path needs Playwright, not every worker at startup
+    from playwright.sync_api import sync_playwright
+
     logger.info(f"🎭 Playwright fallback for TikTok user {username}")
     html = None
     try:
@@ -101,11 +104,15 @@ def _fetch_tiktok_html(username: str):
                     "Accept-Language": "en-US,en;q=0.9",
                 },
             )
+            if resp.status_code == 404:
+                raise PermanentScrapeError(f"TikTok user {username} not found")
             if resp.status_code == 200 and "SIGI_STATE" in resp.text:
                 logger.info(f"✅ ScrapingBee region={region} succeeded for {username}")
                 return resp.text, f"ScrapingBee ({region})"
             else:
                 logger.warning(f"⚠️ TikTok returned {resp.status_code} region={region} for {username}")
+        except PermanentScrapeError:
+            raise
         except Exception as e:
             logger.warning(f"⚠️ Region {region} fails for {username}: {e}")
 
@@ -159,44 +166,33 @@ def _parse_tiktok_profile(html: str) -> dict:
 # ============================================================
 # 🚀 Main Scraper
 # ============================================================
-def scrape_tiktok_profile(username: str):
-    """Fetch TikTok profile, parse, and save to DB."""
+def scrape_tiktok_profile(username: str) -> ScrapeResult:
+    """Fetch and parse a TikTok profile; the calling task saves it."""
     html, source = _fetch_tiktok_html(username)
     if not html:
-        return {"success": False, "reason": f"Failed to fetch HTML: {source}"}
+        raise TransientScrapeError(f"Failed to fetch HTML: {source}")
 
     data = _parse_tiktok_profile(html)
     if not data["username"]:
-        return {"success": False, "reason": "No valid TikTok profile parsed."}
-
-    # Persist
-    profile, _ = Profile.objects.update_or_create(
-        username=username,
-        platform="TikTok",
-        defaults={
-            "full_name": data["full_name"],
-            "avatar_url": data["avatar"],
-        },
-    )
-
-    SocialMediaAccount.objects.update_or_create(
-        profile=profile,
-        platform="TikTok",
-        defaults={
-            "bio": data["bio"],
-            "followers": data["followers"],
-            "following": data["following"],
-            "posts_collected": 0,
-            "is_private": False,
-            "external_url": "",
-        },
-    )
+        return ScrapeResult(username=username, success=False, reason="No valid TikTok profile parsed.")
 
+    # Persisting is left to the calling task, which upserts Profile + SocialMediaAccount
+    # from this ScrapeResult in single INSERT ... ON CONFLICT statements
     logger.info(
-        f"💾 Saved TikTok profile: {username}, followers={data['followers']}, following={data['following']}, likes={data['likes']}, source={source}"
+        f"✅ Parsed TikTok profile: {username}, followers={data['followers']}, following={data['following']}, likes={data['likes']}, source={source}"
     )
 
-    return {"success": True, "source": source, **data}
+    return ScrapeResult(
+        username=username,
+        full_name=data["full_name"],
+        avatar_url=data["avatar"],
+        bio=data["bio"],
+        followers=data["followers"],
+        following=data["following"],
+        likes=data["likes"],
+        external_url="",
+        source=source,
+    )
 
 
 # ============================================================
@@ -1,9 +1,9 @@
-from profile import Profile
 from django.conf import settings
 import tweepy
 from django.core.cache import cache
 from django.utils import timezone
-from profiles.models import RawPost
+from profiles.models import Profile, RawPost
+from profiles.utils.sentiment import polarity
 
 api_key = settings.TWITTER_API_KEY
 
@@ -76,22 +76,53 @@ def fetch_and_store_tweets(username: str, client=None, limit: int = 10):
                 print(f" No Profile object found for {username} (Twitter). Skipping tweet save.")
                 return []
             
-            saved_tweets = []
+            # Rows saved before tweets had ids were keyed on their exact text; give those
+            # their id in place rather than inserting a second copy next to them. Tweets whose
+            # id is already stored just go through the upsert
+            stored_ids = set(
+                RawPost.objects.filter(
+                    profile=profile, post_id__in=[str(tweet.id) for tweet in tweets.data]
+                ).values_list("post_id", flat=True)
+            )
+            legacy = {
+                post.content: post
+                for post in RawPost.objects.filter(
+                    profile=profile,
+                    platform="Twitter",
+                    post_id__isnull=True,
+                    content__in=[tweet.text.strip() for tweet in tweets.data],
+                )
+            }
+
+            # One multi-row INSERT ... ON CONFLICT keyed on the tweet id, instead of a
+            # SELECT + INSERT/UPDATE pair per tweet
+            now = timezone.now()
+            backfilled, new_posts = [], []
             for tweet in tweets.data:
                 content = tweet.text.strip()
                 metrics = tweet.public_metrics or {}
+                post = None if str(tweet.id) in stored_ids else legacy.pop(content, None)
+                if post is None:
+                    post = RawPost(profile=profile, platform="Twitter", content=content)
+                    new_posts.append(post)
+                else:
+                    backfilled.append(post)
+                post.post_id = str(tweet.id)
+                post.timestamp = tweet.created_at or now
+                post.likes = metrics.get("like_count", 0)
+                post.comments = metrics.get("reply_count", 0)
+                post.sentiment_score = round(polarity(content), 3)
 
-                post, created = RawPost.objects.update_or_create(
-                    profile=profile,
-                    content=content,
-                    platform="Twitter",
-                    defaults={
-                        "timestamp": tweet.created_at or timezone.now(),
-                        "likes": metrics.get("like_count", 0),
-                        "comments": metrics.get("reply_count", 0),
-                    },
-                )
-                saved_tweets.append(post)
+            RawPost.objects.bulk_update(
+                backfilled, ["post_id", "timestamp", "likes", "comments", "sentiment_score"]
+            )
+            saved_tweets = backfilled + RawPost.objects.bulk_create(
+                new_posts,
+                update_conflicts=True,
+                unique_fields=["profile", "post_id"],
+                update_fields=["content", "timestamp", "likes", "comments", "sentiment_score"],
+                batch_size=500,
+            )
             print(f"Saved {len(saved_tweets)} tweets for {username}")
             return saved_tweets
         except tweepy.TweepyException as e:
@@ -1,12 +1,15 @@
 import os
 import re
 import random
+import hashlib
 import logging
 from bs4 import BeautifulSoup
-from textblob import TextBlob
 from scrapingbee import ScrapingBeeClient
+from django.db.models.functions import Lower, Substr
 from django.utils import timezone
-from profiles.models import Profile, SocialMediaAccount, RawPost
+from profiles.models import SocialMediaAccount, RawPost
+from profiles.utils.sentiment import polarity
+from profiles.utils.upserts import upsert_account, upsert_profile
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +25,11 @@ NITTER_MIRRORS = [
 # ============================================================
 # 🧩 Helper: ScrapingBee client & value parsing
 # ============================================================
+def _tweet_id(text: str) -> str:
+    """Stable post_id for a tweet scraped without its id."""
+    return "tw-" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
 def _get_client():
     api_key = os.getenv("SCRAPINGBEE_API_KEY")
     if not api_key:
@@ -190,42 +198,56 @@ def scrape_twitter_profile(username: str):
     # ============================================================
     # 🧩 Save to Database
     # ============================================================
-    profile, _ = Profile.objects.get_or_create(
-        username=username,
-        platform="Twitter",
-        defaults={"full_name": title, "avatar_url": avatar_url},
-    )
-    profile.avatar_url = avatar_url or profile.avatar_url
-    profile.save(update_fields=["avatar_url"])
+    # One INSERT ... ON CONFLICT; an empty avatar never overwrites a stored one
+    profile_fields = {"full_name": title}
+    if avatar_url:
+        profile_fields["avatar_url"] = avatar_url
+    profile = upsert_profile(username, "Twitter", profile_fields)
+    profile_id = profile.id
 
-    sm_account, _ = SocialMediaAccount.objects.get_or_create(profile=profile, platform="Twitter")
-    sm_account.bio = bio
-    sm_account.followers = followers
-    sm_account.following = following
-    sm_account.save()
+    upsert_account(profile, "Twitter", {"bio": bio, "followers": followers, "following": following})
 
     # --- Save tweets + sentiment
-    saved_count = 0
+    # Nitter pages carry no tweet ids, so key each tweet on a hash of its text
+    texts = {}
     for text in tweets[:20]:
         text = text.strip()
-        if not text:
-            continue
-        if not RawPost.objects.filter(profile=profile, platform="Twitter", content__icontains=text[:50]).exists():
-            polarity = round(TextBlob(text).sentiment.polarity, 3)
-            RawPost.objects.create(
-                profile=profile,
+        if text:
+            texts.setdefault(_tweet_id(text), text)
+
+    # Rows saved before tweets had ids are matched on their first 50 characters, in one query
+    legacy_prefixes = set(
+        RawPost.objects.filter(profile_id=profile_id, platform="Twitter", post_id__isnull=True)
+        .annotate(prefix=Lower(Substr("content", 1, 50)))
+        .values_list("prefix", flat=True)
+    )
+    texts = {pid: t for pid, t in texts.items() if t[:50].lower() not in legacy_prefixes}
+
+    existing = set(
+        RawPost.objects.filter(profile_id=profile_id, post_id__in=list(texts)).values_list("post_id", flat=True)
+    )
+    now = timezone.now()
+    RawPost.objects.bulk_create(
+        [
+            RawPost(
+                profile_id=profile_id,
                 platform="Twitter",
+                post_id=pid,
                 content=text,
-                timestamp=timezone.now(),
-                sentiment_score=polarity,
+                timestamp=now,
+                sentiment_score=round(polarity(text), 3),
             )
-            saved_count += 1
+            for pid, text in texts.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["profile", "post_id"],
+        update_fields=["sentiment_score"],
+        batch_size=500,
+    )
+    saved_count = len(texts) - len(existing)
 
-    total_posts = RawPost.objects.filter(profile=profile, platform="Twitter").count()
-    profile.posts_count = total_posts
-    sm_account.posts_collected = total_posts
-    profile.save(update_fields=["posts_count"])
-    sm_account.save(update_fields=["posts_collected"])
+    total_posts = RawPost.objects.filter(profile_id=profile_id, platform="Twitter").count()
+    SocialMediaAccount.objects.filter(profile_id=profile_id, platform="Twitter").update(posts_collected=total_posts)
 
     logger.info(
         f"💾 {username}: saved {saved_count}/{len(tweets)} tweets, followers={followers}, following={following}, source={source_type}"
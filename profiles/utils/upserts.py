@@ -0,0 +1,25 @@
+from profiles.models import Profile, SocialMediaAccount
+
+
+def upsert_profile(username: str, platform: str, defaults: dict, insert_only: dict | None = None) -> Profile:
+    """
+    Insert or update a Profile in one INSERT ... ON CONFLICT statement.
+    ``defaults`` are written either way; ``insert_only`` only when the row is new.
+    """
+    return Profile.objects.bulk_create(
+        [Profile(username=username, platform=platform, **{**(insert_only or {}), **defaults})],
+        update_conflicts=True,
+        unique_fields=["username", "platform"],
+        # Nothing to refresh: a no-op SET still makes PostgreSQL return the existing row's id
+        update_fields=list(defaults) or ["username"],
+    )[0]
+
+
+def upsert_account(profile: Profile, platform: str, defaults: dict) -> SocialMediaAccount:
+    """Insert or update the profile's SocialMediaAccount in one INSERT ... ON CONFLICT statement."""
+    return SocialMediaAccount.objects.bulk_create(
+        [SocialMediaAccount(profile=profile, platform=platform, **defaults)],
+        update_conflicts=True,
+        unique_fields=["profile", "platform"],
+        update_fields=list(defaults),
+    )[0]
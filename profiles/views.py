@@ -16,6 +16,7 @@ from celery.result import AsyncResult
 
 from profiles.tasks import (
     ensure_behavioral_record,
+    known_not_found,
     perform_behavioral_analysis,
     scrape_instagram_task,
     scrape_tiktok_task,
@@ -32,6 +33,7 @@ from profiles.utils.sentiment_distribution import generate_sentiment_distributio
 from profiles.utils.sentiment_timeline import generate_sentiment_timeline
 from profiles.utils.tiktok_scraper import unscrape_tiktok_profile
 from profiles.utils.twitter_scraper import unscrape_twitter_bio
+from profiles.utils.upserts import upsert_account, upsert_profile
 from sherlock.utils import run_sherlock
 from .models import Profile, RawPost, SocialMediaAccount
 from .forms import UsernameSearchForm
@@ -65,30 +67,31 @@ def search_profile(request):
             # --- GITHUB (sync) ---
             elif platform == "GitHub":
                 github_data = scrape_github_profile(username)
-                profile, _ = Profile.objects.get_or_create(username=username, platform="GitHub")
-                profile.full_name = github_data.get("name", "")
-                profile.avatar_url = f"https://github.com/{username}.png"
-
+                profile_fields = {
+                    "full_name": github_data.get("name", ""),
+                    "avatar_url": f"https://github.com/{username}.png",
+                    "location": github_data.get("location"),
+                    "company": github_data.get("company"),
+                    "blog": github_data.get("blog"),
+                }
                 if github_data.get("created_at"):
-                    profile.github_created_at = parse_date(github_data["created_at"])
-
-                profile.location = github_data.get("location")
-                profile.company = github_data.get("company")
-                profile.blog = github_data.get("blog")
-                profile.save()
-
-                SocialMediaAccount.objects.update_or_create(
-                    profile=profile,
-                    platform="GitHub",
-                    defaults={
-                        "bio": github_data.get("bio", ""),
-                        "followers": github_data.get("followers", 0),
-                        "following": github_data.get("following", 0),
-                        "public_repos": github_data.get("public_repos", 0),
-                        "posts_collected": 0,
-                    },
-                )
-                ensure_behavioral_record(profile)
+                    profile_fields["github_created_at"] = parse_date(github_data["created_at"])
+
+                # One INSERT ... ON CONFLICT per row instead of get/save + select/update pairs
+                with transaction.atomic():
+                    profile = upsert_profile(username, "GitHub", profile_fields)
+                    upsert_account(
+                        profile=profile,
+                        platform="GitHub",
+                        defaults={
+                            "bio": github_data.get("bio", ""),
+                            "followers": github_data.get("followers", 0),
+                            "following": github_data.get("following", 0),
+                            "public_repos": github_data.get("public_repos", 0),
+                            "posts_collected": 0,
+                        },
+                    )
+                    ensure_behavioral_record(profile)
                 perform_behavioral_analysis.delay(profile.id)
                 logger.info(f"✅ Behavioral analysis queued for {username} (GitHub)")
                 return redirect("profile_dashboard", pk=profile.pk)
@@ -96,6 +99,10 @@ def search_profile(request):
             # --- INSTAGRAM (async) ---
             elif platform == "Instagram":
                 profile, _ = Profile.objects.get_or_create(username=username, platform="Instagram")
+                if known_not_found("Instagram", username):
+                    messages.warning(request, f"Instagram profile for {username} was not found recently; skipping the scrape.")
+                    return redirect("profile_dashboard", pk=profile.pk)
+
                 result = scrape_instagram_task.apply_async(args=[username], queue="instagram")
 
                 messages.info(
@@ -108,6 +115,10 @@ def search_profile(request):
             # --- TIKTOK (async) ---
             elif platform == "TikTok":
                 profile, _ = Profile.objects.get_or_create(username=username, platform="TikTok")
+                if known_not_found("TikTok", username):
+                    messages.warning(request, f"TikTok profile for {username} was not found recently; skipping the scrape.")
+                    return redirect("profile_dashboard", pk=profile.pk)
+
                 result = scrape_tiktok_task.apply_async(args=[username], queue="tiktok")
 
                 messages.info(
@@ -122,7 +133,7 @@ def search_profile(request):
                 profile, _ = Profile.objects.get_or_create(username=username, platform="Sherlock")
                 sherlock_results = run_sherlock(username)
 
-                SocialMediaAccount.objects.update_or_create(
+                upsert_account(
                     profile=profile,
                     platform="Sherlock",
                     defaults={
@@ -255,8 +266,13 @@ def behavioral_dashboard(request, username, platform):
     """
 
     # 1️⃣ Load Profile and Social Media Account
-    profile = get_object_or_404(Profile, username=username, platform=platform)
-    social = SocialMediaAccount.objects.filter(profile=profile, platform=platform).first()
+    # Analysis joined in, accounts prefetched once (the wordcloud reuses the same cache)
+    profile = get_object_or_404(
+        Profile.objects.select_related("behavior_analysis").prefetch_related("socialmediaaccount_set"),
+        username=username,
+        platform=platform,
+    )
+    social = next((s for s in profile.socialmediaaccount_set.all() if s.platform == platform), None)
     analysis = getattr(profile, "behavior_analysis", None)
 
     # 2️⃣ Load posts for this platform only
@@ -320,8 +336,9 @@ def behavioral_dashboard(request, username, platform):
         logger.warning(f"Entity graph generation failed for {username}: {e}")
 
     # 9️⃣ Influence Metrics
-    followers = int(getattr(social, "followers", 0) or 0) if social else 0
-    following = int(getattr(social, "following", 0) or 0) if social else 0
+    # getattr on None falls back to the default, so a missing account needs no separate branch
+    followers = int(getattr(social, "followers", 0) or 0)
+    following = int(getattr(social, "following", 0) or 0)
     network_size = followers + following
 
     sentiment_score = float(getattr(analysis, "sentiment_score", 0.0) or 0.0)